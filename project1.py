@@ -4,7 +4,7 @@
 from project1_constants import (CONSONANT_POINTS, VOWEL_PRICE, CONSONANT_BONUS,
                        PLAYER_ONE, PLAYER_TWO, CONSONANT, VOWEL,
                        SOLVE, QUIT, HUMAN, HUMAN_HUMAN,
-                       HUMAN_COMPUTER, EASY, HARD, ALL_CONSONANTS,
+                       HUMAN_COMPUTER, EASY, HARD, EXPERT, ALL_CONSONANTS,
                        ALL_VOWELS, PRIORITY_CONSONANTS, HIDDEN)
 
 def is_win(puzzle: str, view: str) -> bool:
@@ -230,9 +230,9 @@ def computer_chooses_solve(view: str, difficulty: str,
                            not_yet_guessed_consonants: str) -> bool:
     """Return True if and only if the computer decides to solve the puzzle.
 
-    If difficulty is H, computer chooses to solve the puzzle if half of the
-    characters are revealed or if no more not_yet_guessed_consonants are left
-    to guess.
+    If difficulty is H or X, computer chooses to solve the puzzle if half of
+    the characters are revealed or if no more not_yet_guessed_consonants are
+    left to guess.
 
     If difficulty is E, computer chooses to solve if not_yet_guessed_consonants
     value is none. Else, the computer does not choose to solve.
@@ -241,13 +241,15 @@ def computer_chooses_solve(view: str, difficulty: str,
     True
     >>> computer_chooses_solve('^^^^^^^', 'H', '4')
     False
+    >>> computer_chooses_solve('sc^^nc^', 'X', 'bd')
+    True
 
     """
 
     if len(not_yet_guessed_consonants) == 0:
         return True
 
-    elif difficulty == HARD:
+    elif difficulty in (HARD, EXPERT):
         return not_yet_guessed_consonants == 0 or half_revealed(view)
 
     return False
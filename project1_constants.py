@@ -32,6 +32,7 @@ HUMAN_COMPUTER = 'HC'    # two players, human and computer
 # computer difficulty levels
 EASY = 'E'  # computer plays the "easy" strategy
 HARD = 'H'  # computer plays the "hard" strategy
+EXPERT = 'X'  # computer plays the "expert" strategy, using a phrase bank
 
 # all consonants and all vowels
 ALL_CONSONANTS = 'bcdfghjklmnpqrstvwxyz'
@@ -0,0 +1,273 @@
+"""A bank of phrases indexed by how they look in a view, for project1"""
+#author: Muntaqa Mahmood
+
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from project1_constants import HIDDEN
+
+# Used in docstring examples.
+SAMPLE_PHRASES = ['hello world', 'jelly beans', 'happy days', 'yellow sun',
+                  'hello there', 'salty fries', "don't panic"]
+
+
+def skeleton(text: str) -> str:
+    """Return text with every letter replaced by HIDDEN, so that a phrase
+    and any view of it have the same skeleton.
+
+    >>> skeleton("don't panic")
+    "^^^'^ ^^^^^"
+    >>> skeleton("d^n'^ p^n^c")
+    "^^^'^ ^^^^^"
+    """
+
+    return ''.join(HIDDEN if char.isalpha() else char for char in text)
+
+
+def bitset(indexes: List[int], size: int) -> int:
+    """Return an int with bit i set for each i in indexes, where every index
+    is less than size.
+
+    >>> bin(bitset([0, 3], 4))
+    '0b1001'
+    """
+
+    flags = bytearray((size + 7) // 8)
+    for index in indexes:
+        flags[index >> 3] |= 1 << (index & 7)
+
+    return int.from_bytes(flags, 'little')
+
+
+# The positions of the bits set in each byte, lowest first.
+_BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1)
+              for byte in range(256)]
+
+
+def set_bits(bits: int) -> List[int]:
+    """Return the positions of the bits set in bits, lowest first, in time
+    linear in the number of bytes of bits.
+
+    Precondition: bits >= 0
+
+    >>> set_bits(0b1001)
+    [0, 3]
+    >>> set_bits(0b1 << 17 | 0b11 << 8)
+    [8, 9, 17]
+    """
+
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    positions = []
+    for index, byte in enumerate(data):
+        if byte:
+            base = index << 3
+            positions.extend(base + bit for bit in _BYTE_BITS[byte])
+
+    return positions
+
+
+class PhraseGroup:
+    """The phrases in a PhraseBank with the same skeleton, with a bitset for
+    each position and letter of the phrases at that position with that
+    letter. Bit i of a bitset stands for phrases[i].
+
+    >>> group = PhraseGroup(['hello world', 'jelly beans'])
+    >>> set_bits(group.mask(2, 'l')), set_bits(group.contains('o'))
+    ([0, 1], [0])
+    >>> group.letter_counts(group.all, 'lo'), group.letter_counts(0b10, 'l')
+    ({'l': 5, 'o': 2}, {'l': 2})
+    """
+
+    def __init__(self, phrases: List[str]) -> None:
+        """Initialize a group of phrases, which all have the same
+        skeleton.
+        """
+
+        self.phrases = phrases
+        self.all = (1 << len(phrases)) - 1
+        self.hidden_positions = [position for position, char
+                                 in enumerate(phrases[0]) if char.isalpha()]
+        # For each position, the bitset of the phrases with each letter
+        # there, and for each letter, the phrases with it anywhere.
+        self._masks: Dict[int, Dict[str, int]] = {}
+        self._contains: Dict[str, int] = {}
+        # For each letter, bitset j holds the phrases in which the number of
+        # times it appears has bit j set, so that a few bitsets count it
+        # over any set of phrases.
+        self._planes: Dict[str, List[int]] = {}
+        self._totals: Dict[str, int] = {}
+
+        size = len(phrases)
+        anywhere: Dict[str, List[int]] = {}
+        for position in self.hidden_positions:
+            by_letter: Dict[str, List[int]] = {}
+            for index, phrase in enumerate(phrases):
+                by_letter.setdefault(phrase[position], []).append(index)
+                anywhere.setdefault(phrase[position], []).append(index)
+            self._masks[position] = {letter: bitset(indexes, size)
+                                     for letter, indexes in by_letter.items()}
+
+        self._contains = {letter: bitset(indexes, size)
+                          for letter, indexes in anywhere.items()}
+
+        for letter, indexes in anywhere.items():
+            occurrences = Counter(indexes)
+            self._planes[letter] = [
+                bitset([index for index, count in occurrences.items()
+                        if count >> plane & 1], size)
+                for plane in range(max(occurrences.values()).bit_length())]
+            self._totals[letter] = len(indexes)
+
+    def mask(self, position: int, letter: str) -> int:
+        """Return the bitset of the phrases with letter at position."""
+
+        return self._masks[position].get(letter, 0)
+
+    def contains(self, letter: str) -> int:
+        """Return the bitset of the phrases with letter anywhere."""
+
+        return self._contains.get(letter, 0)
+
+    def letter_counts(self, bits: int,
+                      letters: Iterable[str]) -> Dict[str, int]:
+        """Return, for each of letters, the number of times it appears in
+        the phrases in bits.
+        """
+
+        if bits == self.all:
+            return {letter: self._totals.get(letter, 0) for letter in letters}
+
+        return {letter: sum((bits & plane).bit_count() << index
+                            for index, plane
+                            in enumerate(self._planes.get(letter, ())))
+                for letter in letters}
+
+    def select(self, bits: int) -> List[str]:
+        """Return the phrases whose bits are set in bits, in order."""
+
+        return [self.phrases[index] for index in set_bits(bits)]
+
+    def narrow(self, bits: int, letter: str, positions: Iterable[int],
+               hidden: Iterable[int]) -> int:
+        """Return the phrases in bits that have letter at every position in
+        positions and not at any position in hidden.
+        """
+
+        for position in positions:
+            bits &= self.mask(position, letter)
+        for position in hidden:
+            bits &= ~self.mask(position, letter)
+
+        return bits
+
+
+class PhraseBank:
+    """A collection of phrases indexed by skeleton, which captures their
+    length, the lengths of their words and their punctuation, that finds
+    the phrases that fit a view using bitsets instead of checking each
+    phrase.
+
+    >>> bank = PhraseBank(SAMPLE_PHRASES)
+    >>> bank.candidates('^^^^^ ^^^^^')
+    ['hello world', 'jelly beans', 'hello there', 'salty fries']
+    >>> bank.candidates('^^ll^ ^^^^^', 'l')
+    ['jelly beans', 'hello there']
+    >>> bank.candidates('^^ll^ ^^^^^', 'l', absent='j')
+    ['hello there']
+    >>> bank.candidates('^^ll^ ^^^^^', 'lt')
+    ['jelly beans']
+    >>> bank.candidates("d^n'^ ^^n^^", 'dn')
+    ["don't panic"]
+    """
+
+    def __init__(self, phrases: Iterable[str]) -> None:
+        """Initialize a bank of phrases, in lowercase. Repeated phrases are
+        kept once.
+        """
+
+        grouped: Dict[str, List[str]] = {}
+        seen = set()
+        for phrase in phrases:
+            phrase = phrase.strip().lower()
+            if phrase and phrase not in seen:
+                seen.add(phrase)
+                grouped.setdefault(skeleton(phrase), []).append(phrase)
+
+        self._groups = {key: PhraseGroup(group)
+                        for key, group in grouped.items()}
+        self._size = len(seen)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'PhraseBank':
+        """Return a bank of the phrases in the file at path, one per line."""
+
+        with open(path) as phrase_file:
+            return cls(phrase_file)
+
+    def __len__(self) -> int:
+        """Return the number of phrases in this bank."""
+
+        return self._size
+
+    def __contains__(self, phrase: str) -> bool:
+        """Return True if and only if phrase is in this bank."""
+
+        group = self._groups.get(skeleton(phrase))
+
+        return group is not None and phrase.lower() in group.phrases
+
+    def group(self, view: str) -> Optional[PhraseGroup]:
+        """Return the group of phrases with the same skeleton as view, or
+        None if there are none.
+        """
+
+        return self._groups.get(skeleton(view))
+
+    def match(self, view: str, guessed: str = '',
+              absent: str = '') -> Tuple[Optional[PhraseGroup], int]:
+        """Return the group of phrases with the same skeleton as view, and
+        the bitset of the phrases in it that fit view, as in candidates.
+        """
+
+        group = self.group(view)
+        if group is None:
+            return None, 0
+
+        revealed: Dict[str, List[int]] = {}
+        hidden = []
+        for position in group.hidden_positions:
+            if view[position] == HIDDEN:
+                hidden.append(position)
+            else:
+                revealed.setdefault(view[position], []).append(position)
+
+        bits = group.all
+        for letter, positions in revealed.items():
+            bits = group.narrow(bits, letter, positions, hidden)
+            if not bits:
+                return group, 0
+
+        for letter in set(guessed) - set(revealed):
+            bits = group.narrow(bits, letter, (), hidden)
+        for letter in set(absent):
+            bits &= ~group.contains(letter)
+
+        return group, bits
+
+    def candidates(self, view: str, guessed: str = '',
+                   absent: str = '') -> List[str]:
+        """Return the phrases in this bank that could be the puzzle shown in
+        view, in the order they were added: the phrases with the same
+        skeleton and the same letters at revealed positions, that do not
+        have a letter in guessed, or a revealed letter, at a hidden
+        position, and do not have a letter in absent anywhere.
+        """
+
+        group, bits = self.match(view, guessed, absent)
+
+        return group.select(bits) if group is not None else []
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
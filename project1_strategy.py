@@ -0,0 +1,166 @@
+"""The expert computer strategy for project1, which guesses from the phrases
+that could still be the puzzle"""
+#author: Muntaqa Mahmood
+
+from typing import Dict, List, Optional
+
+from project1_constants import ALL_CONSONANTS, HIDDEN, PRIORITY_CONSONANTS
+from project1_phrases import SAMPLE_PHRASES, PhraseBank
+
+
+class CandidateTracker:
+    """The phrases in a PhraseBank that could still be the puzzle, narrowed
+    after each guess instead of being matched against the whole view again.
+
+    The expert computer guesses the consonant expected to reveal the most
+    characters over the phrases left, rather than going through
+    PRIORITY_CONSONANTS in order; it only falls back to that order to break
+    ties, or when no phrase in the bank fits the view. How many times each
+    consonant not yet guessed appears in the phrases left is worked out once
+    per guess, so choosing a consonant only looks the counts up.
+
+    >>> tracker = CandidateTracker(PhraseBank(SAMPLE_PHRASES), '^^^^^ ^^^^^')
+    >>> tracker.candidates()
+    ['hello world', 'jelly beans', 'hello there', 'salty fries']
+    >>> tracker.choose_consonant('bcdfghjklmnpqrstvwxyz')
+    'l'
+    >>> tracker.update('l', '^^ll^ ^^^^^')
+    >>> tracker.candidates()
+    ['jelly beans', 'hello there']
+    >>> tracker.choose_consonant('bcdfghjkmnpqrstvwxyz')
+    'h'
+    >>> tracker.update('h', 'h^ll^ ^h^^^')
+    >>> tracker.solution()
+    'hello there'
+    """
+
+    def __init__(self, bank: 'PhraseBank', view: str,
+                 guessed: str = '') -> None:
+        """Initialize a tracker of the phrases in bank that fit view, where
+        the letters in guessed have already been guessed.
+        """
+
+        self._group, self._bits = bank.match(view, guessed)
+        self._hidden = [position for position, char in enumerate(view)
+                        if char == HIDDEN]
+        self._guessed = set(guessed) | {char for char in view
+                                        if char.isalpha()}
+        self._counts: Dict[str, int] = {}
+        self._count_letters()
+
+    def count(self) -> int:
+        """Return the number of phrases that could still be the puzzle."""
+
+        return self._bits.bit_count()
+
+    def candidates(self) -> List[str]:
+        """Return the phrases that could still be the puzzle, in the order
+        they were added to the bank.
+        """
+
+        return self._group.select(self._bits) if self._group else []
+
+    def solution(self) -> str:
+        """Return the puzzle if only one phrase could still be it, or else
+        the empty string.
+        """
+
+        return self.candidates()[0] if self.count() == 1 else ''
+
+    def update(self, letter: str, view: str) -> None:
+        """Narrow the phrases that could be the puzzle after letter was
+        guessed and view is what was revealed.
+
+        >>> tracker = CandidateTracker(PhraseBank(SAMPLE_PHRASES),
+        ...                            '^^^^^ ^^^^^')
+        >>> tracker.update('j', '^^^^^ ^^^^^')
+        >>> tracker.candidates()
+        ['hello world', 'hello there', 'salty fries']
+        """
+
+        positions = [position for position in self._hidden
+                     if view[position] == letter]
+        self._hidden = [position for position in self._hidden
+                        if view[position] == HIDDEN]
+
+        self._guessed.add(letter)
+        if self._group is None:
+            return
+
+        if positions:
+            self._bits = self._group.narrow(self._bits, letter, positions,
+                                            self._hidden)
+        else:
+            self._bits &= ~self._group.contains(letter)
+        self._count_letters()
+
+    def expected_occurrences(self, letter: str) -> float:
+        """Return the mean number of hidden characters that letter would
+        reveal over the phrases that could still be the puzzle.
+
+        >>> tracker = CandidateTracker(PhraseBank(SAMPLE_PHRASES),
+        ...                            '^^^^^ ^^^^^')
+        >>> tracker.expected_occurrences('l')
+        2.0
+        >>> tracker.expected_occurrences('e')
+        1.75
+        """
+
+        count = self.count()
+
+        return self._occurrences(letter) / count if count else 0.0
+
+    def choose_consonant(self, not_yet_guessed_consonants: str) -> str:
+        """Return the consonant in not_yet_guessed_consonants expected to
+        reveal the most hidden characters, breaking ties in the order of
+        PRIORITY_CONSONANTS.
+
+        Precondition: not_yet_guessed_consonants is not empty.
+
+        >>> tracker = CandidateTracker(PhraseBank(SAMPLE_PHRASES),
+        ...                            '^^^ ^^^^')
+        >>> tracker.choose_consonant('bcdfghjklmnpqrstvwxyz')
+        't'
+        """
+
+        best: Optional[str] = None
+        best_occurrences = -1
+
+        for consonant in PRIORITY_CONSONANTS:
+            if consonant in not_yet_guessed_consonants:
+                occurrences = self._occurrences(consonant)
+                if occurrences > best_occurrences:
+                    best = consonant
+                    best_occurrences = occurrences
+
+        return best if best is not None else not_yet_guessed_consonants[0]
+
+    def _occurrences(self, letter: str) -> int:
+        """Return the total number of hidden characters that letter would
+        reveal over the phrases that could still be the puzzle.
+        """
+
+        if (letter not in self._counts and letter not in self._guessed
+                and self._group is not None):
+            self._counts.update(self._group.letter_counts(self._bits,
+                                                          letter))
+
+        return self._counts.get(letter, 0)
+
+    def _count_letters(self) -> None:
+        """Work out how many times each consonant not yet guessed appears in
+        the phrases that could still be the puzzle. Letters not yet guessed
+        can only be at hidden positions, so each appearance would be
+        revealed; other letters are counted when first asked about.
+        """
+
+        self._counts = {}
+        if self._group is not None:
+            self._counts = self._group.letter_counts(
+                self._bits, [letter for letter in ALL_CONSONANTS
+                             if letter not in self._guessed])
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -3,7 +3,7 @@
 
 import copy
 import math
-from typing import List, TextIO
+from typing import Dict, List, TextIO
 
 from project2_constants import (ID, NAME, LATITUDE, LONGITUDE, CAPACITY,
                        BIKES_AVAILABLE, DOCKS_AVAILABLE, IS_RENTING,
@@ -315,9 +315,21 @@ def get_direction(start_id: int, end_id: int, stations: List['Station']) -> str:
     'NORTH'
     """
 
+    return direction_between(get_station(start_id, stations),
+                             get_station(end_id, stations))
+
+################## HELPER FUNCTION for "get_direction" ##################
+
+def direction_between(starting_station: 'Station',
+                      ending_station: 'Station') -> str:
+    """Return the direction to travel to get from starting_station to
+    ending_station. Possible directions are defined by DIRECTIONS.
+
+    >>> direction_between(SAMPLE_STATIONS[1], SAMPLE_STATIONS[0])
+    'SOUTHWEST'
+    """
+
     directions = ''
-    starting_station = get_station(start_id, stations)
-    ending_station = get_station(end_id, stations)
 
     if starting_station[LATITUDE] < ending_station[LATITUDE]:
         directions += NORTH
@@ -420,14 +432,7 @@ def rent_bike(station_id: int, stations: List['Station']) -> bool:
     17
     """
 
-    stn = get_station(station_id, stations)
-
-    if stn[IS_RENTING] and (stn[BIKES_AVAILABLE] >= 1):
-        stn[BIKES_AVAILABLE] -= 1
-        stn[DOCKS_AVAILABLE] += 1
-        return True
-
-    return False
+    return rent_from_station(get_station(station_id, stations))
 
 def return_bike(station_id: int, stations: List['Station']) -> bool:
     """Update the available bike count and the docks available count for
@@ -453,11 +458,48 @@ def return_bike(station_id: int, stations: List['Station']) -> bool:
     17
     """
 
-    stn = get_station(station_id, stations)
+    return return_to_station(get_station(station_id, stations))
+
+############ 2 HELPER FUNCTIONS for "rent_bike" and "return_bike" ############
+
+def rent_from_station(station: 'Station') -> bool:
+    """Update station as if a single bike was rented from it. Return True
+    if and only if the rental was successful. This is the rule used by
+    rent_bike once the station has been found.
+
+    >>> station = copy.deepcopy(SAMPLE_STATIONS[0])
+    >>> rent_from_station(station)
+    True
+    >>> station[BIKES_AVAILABLE], station[DOCKS_AVAILABLE]
+    (3, 11)
+    >>> rent_from_station(copy.deepcopy(SAMPLE_STATIONS[1]))
+    False
+    """
 
-    if stn[IS_RENTING] and (stn[DOCKS_AVAILABLE] >= 1):
-        stn[BIKES_AVAILABLE] += 1
-        stn[DOCKS_AVAILABLE] -= 1
+    if station[IS_RENTING] and (station[BIKES_AVAILABLE] >= 1):
+        station[BIKES_AVAILABLE] -= 1
+        station[DOCKS_AVAILABLE] += 1
+        return True
+
+    return False
+
+def return_to_station(station: 'Station') -> bool:
+    """Update station as if a single bike was returned to it. Return True
+    if and only if the return was successful. This is the rule used by
+    return_bike once the station has been found.
+
+    >>> station = copy.deepcopy(SAMPLE_STATIONS[0])
+    >>> return_to_station(station)
+    True
+    >>> station[BIKES_AVAILABLE], station[DOCKS_AVAILABLE]
+    (5, 9)
+    >>> return_to_station(copy.deepcopy(SAMPLE_STATIONS[1]))
+    False
+    """
+
+    if station[IS_RENTING] and (station[DOCKS_AVAILABLE] >= 1):
+        station[BIKES_AVAILABLE] += 1
+        station[DOCKS_AVAILABLE] -= 1
         return True
 
     return False
@@ -496,22 +538,67 @@ def balance_all_bikes(stations: List['Station']) -> int:
     True
     """
 
+    plan = plan_balance(stations)
+    apply_balance_plan(plan, stations)
+
+    return -sum(plan.values())
+
+############# 2 HELPER FUNCTIONS for "balance_all_bikes" #############
+
+def plan_balance(stations: List['Station']) -> Dict[int, int]:
+    """Return the balancing that balance_all_bikes would do to stations,
+    without changing stations, as a dictionary from station id to the
+    change in the number of bikes available at that station. Stations that
+    would not change are left out.
+
+    A station can be returned to, up to the number of docks available, or
+    rented from, down to its target number of bikes, under the same rules
+    as return_to_station and rent_from_station.
+
+    >>> plan_balance(SAMPLE_STATIONS)
+    {7090: 2, 7571: -6}
+    >>> plan_balance(HANDOUT_STATIONS)
+    {7000: -3, 7001: 3}
+    """
+
     target_percent = calculate_target_percentage(stations)
-    bike_returning = 0
-    bike_renting = 0
+    plan = {}
 
     for station in stations:
         target_bikes = round(target_percent * station[CAPACITY])
+        bikes = station[BIKES_AVAILABLE]
+        change = 0
+
+        # Both return_to_station and rent_from_station require the
+        # station to be renting.
+        if station[IS_RENTING] and bikes < target_bikes:
+            change = max(0, min(target_bikes - bikes,
+                                station[DOCKS_AVAILABLE]))
+        elif station[IS_RENTING] and bikes > target_bikes:
+            change = -min(bikes - target_bikes, bikes)
+
+        if change != 0:
+            plan[station[ID]] = change
 
-        while (station[BIKES_AVAILABLE] < target_bikes
-               and return_bike(station[ID], stations)):
-            bike_returning += 1
+    return plan
 
-        while (station[BIKES_AVAILABLE] > target_bikes
-               and rent_bike(station[ID], stations)):
-            bike_renting += 1
+def apply_balance_plan(plan: Dict[int, int],
+                       stations: List['Station']) -> None:
+    """Update the stations in stations by the changes in the number of
+    bikes available given by plan, as returned by plan_balance.
+
+    >>> stations = copy.deepcopy(HANDOUT_STATIONS)
+    >>> apply_balance_plan({7001: 3}, stations)
+    >>> stations[1][BIKES_AVAILABLE], stations[1][DOCKS_AVAILABLE]
+    (8, 7)
+    """
+
+    for station in stations:
+        change = plan.get(station[ID], 0)
 
-    return bike_renting - bike_returning
+        if change != 0:
+            station[BIKES_AVAILABLE] += change
+            station[DOCKS_AVAILABLE] -= change
 
 
 def calculate_target_percentage(stations: List['Station']) -> float:
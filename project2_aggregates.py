@@ -0,0 +1,226 @@
+"""Network totals kept up to date as stations change in project2"""
+#author Muntaqa Mahmood
+
+import copy
+import heapq
+from typing import Dict, Tuple
+
+from project2 import SAMPLE_STATIONS
+from project2_constants import (ID, CAPACITY, BIKES_AVAILABLE,
+                                DOCKS_AVAILABLE, STATION_REMOVED)
+from project2_registry import StationRegistry
+
+# The heap of stations by bikes available is rebuilt once it holds this many
+# times more entries than there are stations.
+HEAP_SLACK = 2
+
+
+class NetworkAggregates:
+    """Totals over the stations in a StationRegistry that are updated as
+    bikes are rented and returned and stations are added and removed,
+    instead of being recomputed from every station when asked for.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> totals = NetworkAggregates(registry)
+    >>> totals.get_total(BIKES_AVAILABLE)
+    23
+    >>> totals.get_station_with_max_bikes()
+    7571
+    >>> all(registry.rent_bike(7571) for _ in range(10))
+    True
+    >>> totals.get_total(BIKES_AVAILABLE), totals.get_total(DOCKS_AVAILABLE)
+    (13, 42)
+    >>> totals.get_station_with_max_bikes()
+    7486
+    >>> totals.count_stations_with_n_docks(15)
+    2
+    >>> totals.calculate_target_percentage()
+    0.23
+    """
+
+    def __init__(self, registry: 'StationRegistry') -> None:
+        """Initialize totals over the stations in registry, and keep them
+        up to date as registry changes.
+        """
+
+        self._registry = registry
+        self._totals = {BIKES_AVAILABLE: 0, DOCKS_AVAILABLE: 0, CAPACITY: 0}
+        # The counted (bikes, docks, capacity, position) of each station.
+        self._seen: Dict[int, Tuple[int, int, int, int]] = {}
+        # Entries of (-bikes, position, id); some may be out of date.
+        self._by_bikes = []
+        self._docks = _Counts()
+
+        for station in registry:
+            self._count(station)
+
+        registry.add_listener(self.update)
+
+    def update(self, change: str, station: 'Station') -> None:
+        """Update these totals after change was made to station in the
+        registry. This is called by the registry.
+        """
+
+        self._uncount(station[ID])
+
+        if change != STATION_REMOVED:
+            self._count(station)
+
+    def get_total(self, index: int) -> int:
+        """Return the sum of the column given by index over all stations.
+
+        Precondition: index is BIKES_AVAILABLE, DOCKS_AVAILABLE or
+        CAPACITY.
+
+        >>> totals = NetworkAggregates(StationRegistry(SAMPLE_STATIONS))
+        >>> totals.get_total(CAPACITY)
+        56
+        """
+
+        return self._totals[index]
+
+    def calculate_target_percentage(self) -> float:
+        """Return the target percentage of available bikes at each station,
+        like calculate_target_percentage in project2.
+
+        Precondition: the total capacity of the stations is not 0.
+        """
+
+        return round(self._totals[BIKES_AVAILABLE] / self._totals[CAPACITY],
+                     2)
+
+    def get_station_with_max_bikes(self) -> int:
+        """Return the id of the station with the most bikes available. If
+        there is a tie, return the id of the station added to the registry
+        first. Like get_station_with_max_bikes in project2, return -1 if no
+        station has a bike available.
+
+        >>> totals = NetworkAggregates(StationRegistry())
+        >>> totals.get_station_with_max_bikes()
+        -1
+        """
+
+        heap = self._by_bikes
+
+        while heap and self._is_out_of_date(heap[0]):
+            heapq.heappop(heap)
+
+        if not heap or heap[0][0] >= 0:
+            return -1
+
+        return heap[0][2]
+
+    def count_stations_with_n_docks(self, num: int) -> int:
+        """Return the number of stations with at least num docks available.
+
+        >>> totals = NetworkAggregates(StationRegistry(SAMPLE_STATIONS))
+        >>> totals.count_stations_with_n_docks(12)
+        1
+        """
+
+        return self._docks.count_at_least(num)
+
+    def _count(self, station: 'Station') -> None:
+        """Add station to these totals."""
+
+        station_id = station[ID]
+        bikes = station[BIKES_AVAILABLE]
+        docks = station[DOCKS_AVAILABLE]
+        capacity = station[CAPACITY]
+        position = self._registry.position(station_id)
+
+        self._seen[station_id] = (bikes, docks, capacity, position)
+        self._totals[BIKES_AVAILABLE] += bikes
+        self._totals[DOCKS_AVAILABLE] += docks
+        self._totals[CAPACITY] += capacity
+        self._docks.add(docks, 1)
+
+        heapq.heappush(self._by_bikes, (-bikes, position, station_id))
+        if len(self._by_bikes) > HEAP_SLACK * len(self._seen) + 1:
+            self._by_bikes = [(-bikes, position, station_id)
+                              for station_id, (bikes, _, _, position)
+                              in self._seen.items()]
+            heapq.heapify(self._by_bikes)
+
+    def _uncount(self, station_id: int) -> None:
+        """Remove the station with id station_id from these totals, if it
+        was counted.
+        """
+
+        if station_id not in self._seen:
+            return
+
+        bikes, docks, capacity, _ = self._seen.pop(station_id)
+        self._totals[BIKES_AVAILABLE] -= bikes
+        self._totals[DOCKS_AVAILABLE] -= docks
+        self._totals[CAPACITY] -= capacity
+        self._docks.add(docks, -1)
+
+    def _is_out_of_date(self, entry: Tuple[int, int, int]) -> bool:
+        """Return True if and only if entry from the heap of stations by
+        bikes available no longer matches its station.
+        """
+
+        negative_bikes, position, station_id = entry
+        seen = self._seen.get(station_id)
+
+        return (seen is None or seen[0] != -negative_bikes
+                or seen[3] != position)
+
+
+class _Counts:
+    """A count of how many times each whole number at least 0 has been
+    added, that can say how many added numbers are at least some number in
+    O(log n) time. Negative numbers are counted as 0.
+    """
+
+    def __init__(self) -> None:
+        self._tree = [0] * 64
+        self._total = 0
+
+    def add(self, value: int, amount: int) -> None:
+        """Count value amount more times (amount may be negative)."""
+
+        value = max(0, value)
+        while value >= len(self._tree):
+            self._grow()
+
+        self._total += amount
+        index = value + 1
+        while index <= len(self._tree):
+            self._tree[index - 1] += amount
+            index += index & -index
+
+    def count_at_least(self, num: int) -> int:
+        """Return how many of the counted values are at least num."""
+
+        if num <= 0:
+            return self._total
+
+        below = 0
+        index = min(num, len(self._tree))
+        while index > 0:
+            below += self._tree[index - 1]
+            index -= index & -index
+
+        return self._total - below
+
+    def _grow(self) -> None:
+        """Double the largest value that can be counted."""
+
+        counts = [self._count_of(value) for value in range(len(self._tree))]
+        self._tree = [0] * (2 * len(self._tree))
+        self._total = 0
+        for value, count in enumerate(counts):
+            if count:
+                self.add(value, count)
+
+    def _count_of(self, value: int) -> int:
+        """Return how many times value has been counted."""
+
+        return self.count_at_least(value) - self.count_at_least(value + 1)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,190 @@
+"""Precomputed station attribute flags for project2"""
+#author Muntaqa Mahmood
+
+import math
+from array import array
+from itertools import compress
+from typing import Callable, Dict, List, Optional, Tuple
+
+from project2 import SAMPLE_STATIONS, has_kiosk
+from project2_constants import (ID, NAME, LATITUDE, LONGITUDE,
+                                BIKES_AVAILABLE, DOCKS_AVAILABLE)
+
+# The name of the flag for stations with a kiosk.
+KIOSK = 'kiosk'
+
+# The flags worked out for every station by default, and how.
+DEFAULT_FLAGS: Dict[str, Callable[['Station'], bool]] = {KIOSK: has_kiosk}
+
+# The size in degrees of latitude and longitude of a neighbourhood tile by
+# default (about 1 km north to south).
+DEFAULT_TILE_SIZE = 0.01
+
+
+def tile_of(lat: float, lon: float,
+            tile_size: float = DEFAULT_TILE_SIZE) -> Tuple[int, int]:
+    """Return the (row, column) of the tile_size by tile_size degree tile
+    holding the location given by lat and lon.
+
+    >>> tile_of(43.681991, -79.329455)
+    (4368, -7933)
+    """
+
+    return (math.floor(lat / tile_size), math.floor(lon / tile_size))
+
+
+class StationAttributes:
+    """Flags worked out once for each of a list of stations, such as
+    whether it has a kiosk, and the neighbourhood tile each station is in,
+    so that queries filtering on them do not look at station names again.
+
+    Each flag is a bytearray with a 1 or 0 for each station, in the same
+    order as the stations, and flags are combined and used to select
+    stations without checking one station at a time. Flags must be worked
+    out again with add_flag if stations are renamed, and the attributes
+    rebuilt if stations are added, removed or moved.
+
+    >>> attributes = StationAttributes(SAMPLE_STATIONS)
+    >>> attributes.flag(KIOSK)
+    bytearray(b'\\x01\\x01\\x00')
+    >>> attributes.select(attributes.flag(KIOSK))
+    [7090, 7486]
+    >>> attributes.get_station_info(7571)
+    ['Highfield Rd / Gerrard St E - SMART', 14, 5, False]
+
+    Nearest station queries go through a StationIndex built with these
+    attributes, which uses their kiosk flag.
+    """
+
+    def __init__(self, stations: List['Station'],
+                 flags: Optional[Dict[str, Callable[['Station'], bool]]]
+                 = None, tile_size: float = DEFAULT_TILE_SIZE) -> None:
+        """Initialize the attributes of stations: a flag for each rule in
+        DEFAULT_FLAGS and in flags, which may add to or replace the rules in
+        DEFAULT_FLAGS, and the tile_size by tile_size degree tile of each
+        station.
+
+        >>> big = {'big': lambda station: station[4] > 16}
+        >>> attributes = StationAttributes(SAMPLE_STATIONS, flags=big)
+        >>> attributes.select(attributes.flag('big'))
+        [7486, 7571]
+        >>> attributes.get_station_info(7090)
+        ['Danforth Ave / Lamb Ave', 4, 10, True]
+        """
+
+        self._stations = list(stations)
+        self._ids = [station[ID] for station in self._stations]
+        self._positions = {station_id: position
+                           for position, station_id in enumerate(self._ids)}
+        self._flags: Dict[str, bytearray] = {}
+        self._tile_size = tile_size
+        self._rows = array('i')
+        self._columns = array('i')
+
+        for station in self._stations:
+            row, column = tile_of(station[LATITUDE], station[LONGITUDE],
+                                  tile_size)
+            self._rows.append(row)
+            self._columns.append(column)
+
+        for name, rule in {**DEFAULT_FLAGS, **(flags or {})}.items():
+            self.add_flag(name, rule)
+
+    def __len__(self) -> int:
+        """Return the number of stations with attributes."""
+
+        return len(self._stations)
+
+    def add_flag(self, name: str, rule: Callable[['Station'], bool]) -> None:
+        """Work out the flag called name for every station, set for the
+        stations for which rule returns True.
+
+        >>> attributes = StationAttributes(SAMPLE_STATIONS)
+        >>> attributes.add_flag('big', lambda station: station[4] > 16)
+        >>> attributes.select(attributes.mask(KIOSK, 'big'))
+        [7486]
+        """
+
+        self._flags[name] = bytearray(1 if rule(station) else 0
+                                      for station in self._stations)
+
+    def flag(self, name: str) -> bytearray:
+        """Return the flag called name for every station."""
+
+        return self._flags[name]
+
+    def has(self, station_id: int, name: str) -> bool:
+        """Return True if and only if the flag called name is set for the
+        station with id station_id.
+
+        Precondition: the station with id station_id has attributes.
+        """
+
+        return self._flags[name][self._positions[station_id]] == 1
+
+    def mask(self, *names: str) -> bytearray:
+        """Return a 1 for each station with all of the flags in names set,
+        and a 0 for every other station.
+        """
+
+        size = len(self._stations)
+        combined = int.from_bytes(bytes([1]) * size, 'big')
+        for name in names:
+            combined &= int.from_bytes(self._flags[name], 'big')
+
+        return bytearray(combined.to_bytes(size, 'big'))
+
+    def tile(self, station_id: int) -> Tuple[int, int]:
+        """Return the (row, column) of the tile the station with id
+        station_id is in.
+
+        Precondition: the station with id station_id has attributes.
+        """
+
+        position = self._positions[station_id]
+
+        return (self._rows[position], self._columns[position])
+
+    def tile_mask(self, tile: Tuple[int, int]) -> bytearray:
+        """Return a 1 for each station in tile and a 0 for every other
+        station.
+
+        >>> attributes = StationAttributes(SAMPLE_STATIONS, tile_size=0.1)
+        >>> attributes.select(attributes.tile_mask((436, -794)))
+        [7090, 7571]
+        """
+
+        row, column = tile
+        return bytearray(1 if station_row == row and station_column == column
+                         else 0 for station_row, station_column
+                         in zip(self._rows, self._columns))
+
+    def select(self, mask: bytearray) -> List[int]:
+        """Return the ids of the stations with a 1 in mask, in order."""
+
+        return list(compress(self._ids, mask))
+
+    def select_stations(self, mask: bytearray) -> List['Station']:
+        """Return the stations with a 1 in mask, in order."""
+
+        return list(compress(self._stations, mask))
+
+    def get_station_info(self, station_id: int) -> list:
+        """Return the name, bikes available, docks available and kiosk flag
+        of the station with id station_id, like get_station_info in
+        project2, or an empty list if there is no such station.
+        """
+
+        position = self._positions.get(station_id)
+        if position is None:
+            return []
+
+        station = self._stations[position]
+
+        return [station[NAME], station[BIKES_AVAILABLE],
+                station[DOCKS_AVAILABLE], self._flags[KIOSK][position] == 1]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
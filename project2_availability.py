@@ -0,0 +1,188 @@
+"""Sorted indexes of bikes and docks available for project2"""
+#author Muntaqa Mahmood
+
+import copy
+import math
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, List, Tuple
+
+from project2 import SAMPLE_STATIONS
+from project2_constants import (ID, BIKES_AVAILABLE, DOCKS_AVAILABLE,
+                                STATION_REMOVED)
+from project2_registry import StationRegistry
+
+# The values of each station that are indexed.
+INDEXED_COLUMNS = (BIKES_AVAILABLE, DOCKS_AVAILABLE)
+
+
+class AvailabilityIndex:
+    """The stations in a StationRegistry kept sorted by bikes available and
+    by docks available, so the stations with at least, at most or between
+    some numbers of bikes or docks are found by binary search instead of by
+    checking every station.
+
+    Answers list station ids in the order the stations were added to the
+    registry, like get_stations_with_n_docks in project2. The index listens
+    to the registry, so it stays up to date as bikes are rented and
+    returned.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> index = AvailabilityIndex(registry)
+    >>> index.get_stations_with_n_docks(2)
+    [7090, 7486, 7571]
+    >>> index.get_stations_with_n_docks(12)
+    [7486]
+    >>> all(registry.return_bike(7090) for _ in range(3))
+    True
+    >>> index.at_most(DOCKS_AVAILABLE, 7)
+    [7090, 7571]
+    >>> index.between(BIKES_AVAILABLE, 5, 10)
+    [7090, 7486]
+    """
+
+    def __init__(self, registry: 'StationRegistry') -> None:
+        """Initialize an index of the stations in registry, and keep it up
+        to date as registry changes.
+        """
+
+        self._registry = registry
+        # For each indexed column, sorted entries of (value, position, id).
+        self._entries: Dict[int, List[Tuple[int, int, int]]] = {
+            index: [] for index in INDEXED_COLUMNS}
+        # The indexed entry of each station for each column.
+        self._seen: Dict[int, Dict[int, Tuple[int, int, int]]] = {}
+
+        for station in registry:
+            self._add(station)
+
+        registry.add_listener(self.update)
+
+    def __len__(self) -> int:
+        """Return the number of stations in this index."""
+
+        return len(self._seen)
+
+    def update(self, change: str, station: 'Station') -> None:
+        """Update this index after change was made to station in the
+        registry. This is called by the registry.
+        """
+
+        seen = self._seen.get(station[ID])
+
+        if change == STATION_REMOVED or seen is None:
+            self._remove(station[ID])
+            if change != STATION_REMOVED:
+                self._add(station)
+            return
+
+        position = self._registry.position(station[ID])
+        for index, entries in self._entries.items():
+            entry = (station[index], position, station[ID])
+            if seen[index] != entry:
+                del entries[bisect_left(entries, seen[index])]
+                insort(entries, entry)
+                seen[index] = entry
+
+    def get_stations_with_n_docks(self, num: int) -> List[int]:
+        """Return the ids of the stations with at least num docks
+        available, like get_stations_with_n_docks in project2.
+        """
+
+        return self.at_least(DOCKS_AVAILABLE, num)
+
+    def at_least(self, index: int, num: int) -> List[int]:
+        """Return the ids of the stations whose value at index is at least
+        num.
+
+        Precondition: index is BIKES_AVAILABLE or DOCKS_AVAILABLE.
+
+        >>> index = AvailabilityIndex(StationRegistry(SAMPLE_STATIONS))
+        >>> index.at_least(BIKES_AVAILABLE, 5)
+        [7486, 7571]
+        """
+
+        entries = self._entries[index]
+
+        return _in_order(entries, bisect_left(entries, (num,)), len(entries))
+
+    def at_most(self, index: int, num: int) -> List[int]:
+        """Return the ids of the stations whose value at index is at most
+        num.
+
+        Precondition: index is BIKES_AVAILABLE or DOCKS_AVAILABLE.
+
+        >>> index = AvailabilityIndex(StationRegistry(SAMPLE_STATIONS))
+        >>> index.at_most(BIKES_AVAILABLE, 4)
+        [7090]
+        """
+
+        entries = self._entries[index]
+
+        return _in_order(entries, 0, bisect_right(entries, (num, math.inf)))
+
+    def between(self, index: int, low: int, high: int) -> List[int]:
+        """Return the ids of the stations whose value at index is at least
+        low and at most high.
+
+        Precondition: index is BIKES_AVAILABLE or DOCKS_AVAILABLE.
+        """
+
+        entries = self._entries[index]
+
+        return _in_order(entries, bisect_left(entries, (low,)),
+                         bisect_right(entries, (high, math.inf)))
+
+    def count_between(self, index: int, low: int, high: int) -> int:
+        """Return the number of stations whose value at index is at least
+        low and at most high, without listing them.
+
+        >>> index = AvailabilityIndex(StationRegistry(SAMPLE_STATIONS))
+        >>> index.count_between(DOCKS_AVAILABLE, 10, 20)
+        2
+        """
+
+        entries = self._entries[index]
+
+        return max(0, bisect_right(entries, (high, math.inf))
+                   - bisect_left(entries, (low,)))
+
+    def _add(self, station: 'Station') -> None:
+        """Add station to this index."""
+
+        position = self._registry.position(station[ID])
+        seen = self._seen[station[ID]] = {}
+
+        for index, entries in self._entries.items():
+            entry = seen[index] = (station[index], position, station[ID])
+            insort(entries, entry)
+
+    def _remove(self, station_id: int) -> None:
+        """Remove the station with id station_id from this index, if it is
+        in it.
+        """
+
+        seen = self._seen.pop(station_id, None)
+        if seen is None:
+            return
+
+        for index, entries in self._entries.items():
+            del entries[bisect_left(entries, seen[index])]
+
+
+def _in_order(entries: List[Tuple[int, int, int]], start: int,
+              end: int) -> List[int]:
+    """Return the ids in entries[start:end] in the order their stations
+    were added to the registry.
+    """
+
+    if start >= end:
+        return []
+
+    return [station_id for _, station_id
+            in sorted((position, station_id)
+                      for _, position, station_id in entries[start:end])]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,272 @@
+"""Benchmarks and synthetic station networks for project2"""
+#author Muntaqa Mahmood
+
+import argparse
+import copy
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+from project2 import (csv_to_list, clean_data, get_station,
+                      get_nearest_station, balance_all_bikes,
+                      get_stations_with_n_docks, rent_bike, return_bike)
+from project2_constants import (ID, LATITUDE, LONGITUDE, CAPACITY,
+                                BIKES_AVAILABLE, DOCKS_AVAILABLE,
+                                IS_RENTING, IS_RETURNING, NO_KIOSK_LABEL)
+from project2_registry import StationRegistry
+from project2_spatial import StationIndex
+
+# The centre of the synthetic city (downtown Toronto) and how far, in
+# degrees, its neighbourhoods spread from the centre.
+CITY_CENTRE = (43.6532, -79.3832)
+CITY_SPREAD = 0.12
+
+# How far, in degrees, stations spread from the centre of their
+# neighbourhood.
+NEIGHBOURHOOD_SPREAD = 0.008
+
+# The share of synthetic stations without a kiosk, and of those not renting.
+SMART_SHARE = 0.2
+NOT_RENTING_SHARE = 0.03
+
+# The number of stations in each neighbourhood, on average.
+STATIONS_PER_NEIGHBOURHOOD = 50
+
+# The header of a station CSV file.
+CSV_HEADER = ('id,name,latitude,longitude,capacity,bikes_available,'
+              'docks_available,is_renting,is_returning')
+
+# The network sizes benchmarked by default.
+DEFAULT_SIZES = (1000, 10000)
+
+
+def generate_stations(count: int, seed: int = 0) -> List['Station']:
+    """Return count synthetic stations, the same for the same seed, grouped
+    in neighbourhoods around CITY_CENTRE. About SMART_SHARE of them have no
+    kiosk and about NOT_RENTING_SHARE are neither renting nor returning.
+
+    >>> stations = generate_stations(500, seed=1)
+    >>> len(stations), stations[0][ID], stations[-1][ID]
+    (500, 7000, 7499)
+    >>> stations == generate_stations(500, seed=1)
+    True
+    >>> all(station[BIKES_AVAILABLE] + station[DOCKS_AVAILABLE]
+    ...     == station[CAPACITY] for station in stations)
+    True
+    """
+
+    rng = random.Random(seed)
+    centres = [(rng.gauss(CITY_CENTRE[0], CITY_SPREAD / 2),
+                rng.gauss(CITY_CENTRE[1], CITY_SPREAD))
+               for _ in range(max(1, count // STATIONS_PER_NEIGHBOURHOOD))]
+    stations = []
+
+    for number in range(count):
+        lat, lon = rng.choice(centres)
+        name = 'Street {} / Avenue {}'.format(number // 100, number % 100)
+        if rng.random() < SMART_SHARE:
+            name += ' - ' + NO_KIOSK_LABEL
+        capacity = rng.randint(11, 35)
+        bikes = rng.randint(0, capacity)
+        renting = rng.random() >= NOT_RENTING_SHARE
+
+        stations.append([7000 + number, name,
+                         round(rng.gauss(lat, NEIGHBOURHOOD_SPREAD), 6),
+                         round(rng.gauss(lon, NEIGHBOURHOOD_SPREAD), 6),
+                         capacity, bikes, capacity - bikes, renting,
+                         renting])
+
+    return stations
+
+
+def stations_to_csv(stations: List['Station']) -> str:
+    """Return the text of a station CSV file holding stations.
+
+    >>> data = csv_to_list(io.StringIO(stations_to_csv(generate_stations(3))))
+    >>> clean_data(data)
+    >>> data == generate_stations(3)
+    True
+    """
+
+    lines = [CSV_HEADER]
+    for station in stations:
+        lines.append(','.join(str(value) for value in station))
+
+    return '\n'.join(lines) + '\n'
+
+
+def time_best(func: Callable[[], object], repeat: int) -> float:
+    """Return the shortest time in seconds taken by func over repeat calls.
+    """
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def run_benchmarks(size: int, seed: int = 0, repeat: int = 3,
+                   queries: int = 100) -> List[Dict[str, object]]:
+    """Return the results of timing the project2 functions on a synthetic
+    network of size stations. Each result gives the benchmark name, the
+    network size, the number of operations timed, the best time in seconds
+    over repeat runs and the operations per second.
+
+    >>> results = run_benchmarks(200, repeat=1, queries=5)
+    >>> [result['name'] for result in results][:3]
+    ['clean_data', 'get_station', 'StationRegistry.get_station']
+    >>> all(result['size'] == 200 for result in results)
+    True
+    """
+
+    stations = generate_stations(size, seed)
+    rng = random.Random(seed)
+    ids = [rng.choice(stations)[ID] for _ in range(queries)]
+    points = [(rng.choice(stations)[LATITUDE] + rng.uniform(-0.01, 0.01),
+               rng.choice(stations)[LONGITUDE] + rng.uniform(-0.01, 0.01))
+              for _ in range(queries)]
+    # Stations where renting a bike and then returning it both succeed, so
+    # every rent and return benchmarked is a call that does the work.
+    rentable = [station[ID] for station in stations
+                if station[IS_RENTING] and station[IS_RETURNING]
+                and station[BIKES_AVAILABLE] > 0]
+    rental_ids = ([rng.choice(rentable) for _ in range(queries)]
+                  if rentable else [])
+    text = stations_to_csv(stations)
+    registry = StationRegistry(copy.deepcopy(stations))
+    index = StationIndex(stations)
+    results = []
+
+    def record(name: str, operations: int, func: Callable[[], object],
+               setup: Optional[Callable[[], None]] = None) -> None:
+        best = float('inf')
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            best = min(best, time_best(func, 1))
+        results.append({'name': name, 'size': size, 'operations': operations,
+                        'seconds': best,
+                        'ops_per_second': operations / best if best else 0.0})
+
+    def load() -> None:
+        data = csv_to_list(io.StringIO(text))
+        clean_data(data)
+
+    record('clean_data', size, load)
+    record('get_station', queries,
+           lambda: [get_station(station_id, stations) for station_id in ids])
+    record('StationRegistry.get_station', queries,
+           lambda: [registry.get_station(station_id) for station_id in ids])
+    record('get_nearest_station', queries,
+           lambda: [get_nearest_station(lat, lon, False, stations)
+                    for lat, lon in points])
+    record('StationIndex.nearest', queries,
+           lambda: [index.nearest(lat, lon) for lat, lon in points])
+    record('get_stations_with_n_docks', 10,
+           lambda: [get_stations_with_n_docks(num, stations)
+                    for num in range(10)])
+
+    working = []
+
+    def fresh_copy() -> None:
+        working[:] = [station[:] for station in stations]
+
+    record('balance_all_bikes', size, lambda: balance_all_bikes(working),
+           fresh_copy)
+    record('rent_bike/return_bike', 2 * len(rental_ids),
+           lambda: [(rent_bike(station_id, working),
+                     return_bike(station_id, working))
+                    for station_id in rental_ids],
+           fresh_copy)
+    record('StationRegistry.rent_bike/return_bike', 2 * len(rental_ids),
+           lambda: [(registry.rent_bike(station_id),
+                     registry.return_bike(station_id))
+                    for station_id in rental_ids])
+
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """Return a description of where benchmarks are being run: the Python
+    version, the platform and, if available, the current git commit.
+    """
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'],
+                                capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ''
+
+    return {'python': platform.python_version(),
+            'platform': platform.platform(), 'commit': commit}
+
+
+def compare_results(old: List[Dict[str, object]],
+                    new: List[Dict[str, object]]) -> Dict[str, float]:
+    """Return, for each benchmark name and size in both old and new, the
+    time in new divided by the time in old, so values above 1 are
+    slowdowns.
+
+    >>> compare_results([{'name': 'x', 'size': 1, 'seconds': 2.0}],
+    ...                 [{'name': 'x', 'size': 1, 'seconds': 3.0}])
+    {'x@1': 1.5}
+    """
+
+    before = {(result['name'], result['size']): result['seconds']
+              for result in old}
+    ratios = {}
+
+    for result in new:
+        key = (result['name'], result['size'])
+        if key in before and before[key]:
+            ratios['{}@{}'.format(*key)] = result['seconds'] / before[key]
+
+    return ratios
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmarks described by the command line arguments argv and
+    write the results as JSON.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=list(DEFAULT_SIZES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--output', help='file to write (default: stdout)')
+    parser.add_argument('--compare', help='earlier results to compare with')
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_benchmarks(size, args.seed, args.repeat,
+                                      args.queries))
+
+    report = {'environment': environment(), 'seed': args.seed,
+              'results': results}
+    if args.compare:
+        with open(args.compare) as old_file:
+            report['ratios'] = compare_results(json.load(old_file)['results'],
+                                               results)
+
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    main()
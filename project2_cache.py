@@ -0,0 +1,172 @@
+"""Caching nearest station queries for project2"""
+#author Muntaqa Mahmood
+
+import copy
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from project2 import SAMPLE_STATIONS, has_kiosk
+from project2_constants import (ID, LATITUDE, LONGITUDE, BIKES_AVAILABLE,
+                                DOCKS_AVAILABLE, STATION_ADDED,
+                                STATION_REMOVED)
+from project2_registry import StationRegistry
+from project2_spatial import StationIndex
+
+# The number of decimal places query coordinates are rounded to by default
+# (4 places is about 10 metres).
+DEFAULT_PRECISION = 4
+
+# The number of answers kept by default.
+DEFAULT_CACHE_SIZE = 4096
+
+# The positions of the filters in a cache key.
+_WITH_BIKES = 3
+_WITH_DOCKS = 4
+
+
+class NearestStationCache:
+    """Answers to nearest station queries on the stations in a
+    StationRegistry, remembered for the most recently used query locations.
+
+    Query coordinates are rounded to precision decimal places, and the
+    answer is the nearest station to the rounded location, so nearby
+    queries share an answer. The cache listens to the registry: adding,
+    removing, moving or renaming a station forgets every answer, and a
+    station running out of (or getting its first) bike or dock forgets the
+    answers that filter on bikes or docks.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> cache = NearestStationCache(registry, maxsize=1)
+    >>> cache.nearest(43.671134, -79.325164)
+    7571
+    >>> cache.nearest(43.67113, -79.32516)
+    7571
+    >>> cache.nearest(43.671134, -79.325164, with_bikes=True)
+    7571
+    >>> all(registry.rent_bike(7571) for _ in range(14))
+    True
+    >>> cache.nearest(43.671134, -79.325164, with_bikes=True)
+    7090
+    >>> cache.stats()
+    {'hits': 1, 'misses': 3, 'evictions': 1, 'invalidations': 1, 'size': 1}
+    """
+
+    def __init__(self, registry: 'StationRegistry',
+                 precision: int = DEFAULT_PRECISION,
+                 maxsize: int = DEFAULT_CACHE_SIZE) -> None:
+        """Initialize an empty cache of answers about the stations in
+        registry, keeping at most maxsize answers.
+        """
+
+        self._registry = registry
+        self._precision = precision
+        self._maxsize = maxsize
+        self._entries: 'OrderedDict[tuple, int]' = OrderedDict()
+        self._index: Optional[StationIndex] = None
+        # The (lat, lon, kiosk, has bikes, has docks) of each station.
+        self._seen: Dict[int, Tuple] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        for station in registry:
+            self._seen[station[ID]] = _features(station)
+
+        registry.add_listener(self.update)
+
+    def nearest(self, lat: float, lon: float, with_kiosk: bool = False,
+                with_bikes: bool = False, with_docks: bool = False) -> int:
+        """Return the id of the station nearest to the location given by lat
+        and lon, rounded to this cache's precision, using the filters of
+        StationIndex.nearest.
+        """
+
+        lat = round(lat, self._precision)
+        lon = round(lon, self._precision)
+        key = (lat, lon, with_kiosk, with_bikes, with_docks)
+
+        station_id = self._entries.get(key)
+        if station_id is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return station_id
+
+        self.misses += 1
+        if self._index is None:
+            self._index = StationIndex(self._registry.stations())
+
+        station_id = self._index.nearest(lat, lon, with_kiosk, with_bikes,
+                                         with_docks)
+        self._entries[key] = station_id
+
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+        return station_id
+
+    def update(self, change: str, station: 'Station') -> None:
+        """Forget the answers that change to station may have made out of
+        date. This is called by the registry.
+        """
+
+        station_id = station[ID]
+        before = self._seen.pop(station_id, None)
+        after = None
+
+        if change != STATION_REMOVED:
+            after = self._seen[station_id] = _features(station)
+
+        if change in (STATION_ADDED, STATION_REMOVED) or before is None:
+            self._index = None
+            self.clear()
+        elif before[:3] != after[:3]:
+            self._index = None
+            self.clear()
+        else:
+            if before[_WITH_BIKES] != after[_WITH_BIKES]:
+                self._forget(_WITH_BIKES)
+            if before[_WITH_DOCKS] != after[_WITH_DOCKS]:
+                self._forget(_WITH_DOCKS)
+
+    def clear(self) -> None:
+        """Forget every answer."""
+
+        if self._entries:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the numbers of hits, misses, evictions and invalidated
+        answers so far, and the number of answers kept.
+        """
+
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'size': len(self._entries)}
+
+    def _forget(self, position: int) -> None:
+        """Forget the answers whose key is True at position."""
+
+        stale = [key for key in self._entries if key[position]]
+        for key in stale:
+            del self._entries[key]
+
+        self.invalidations += len(stale)
+
+
+def _features(station: 'Station') -> Tuple:
+    """Return the values of station that answers in a NearestStationCache
+    depend on: its location, whether it has a kiosk, and whether it has a
+    bike and a dock available.
+    """
+
+    return (station[LATITUDE], station[LONGITUDE], has_kiosk(station),
+            station[BIKES_AVAILABLE] > 0, station[DOCKS_AVAILABLE] > 0)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
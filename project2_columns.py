@@ -0,0 +1,246 @@
+"""Column-oriented station storage for project2"""
+#author Muntaqa Mahmood
+
+from array import array
+from itertools import compress
+from typing import Iterator, List, Optional, Sequence
+
+from project2 import SAMPLE_STATIONS, HANDOUT_STATIONS, has_kiosk
+from project2_attributes import KIOSK, StationAttributes
+from project2_constants import (ID, NAME, LATITUDE, LONGITUDE, CAPACITY,
+                                BIKES_AVAILABLE, DOCKS_AVAILABLE, IS_RENTING,
+                                IS_RETURNING)
+
+# The station indexes whose values are stored as 0 or 1 and read as bools.
+FLAG_COLUMNS = (IS_RENTING, IS_RETURNING)
+
+# The number of values in each station.
+STATION_WIDTH = 9
+
+
+class StationTable:
+    """Stations stored one column per station field, rather than one list
+    per station: typed arrays for ids, counts and coordinates, a list for
+    names, and bytearrays for the renting, returning and kiosk flags.
+
+    Indexing a StationTable gives a StationRow, which can be indexed with
+    the constants in project2_constants like a station list, so the list
+    based functions in project2 also work on a StationTable.
+
+    Precondition: no station has None for any of its values.
+
+    >>> table = StationTable(SAMPLE_STATIONS)
+    >>> len(table)
+    3
+    >>> table[0][NAME]
+    'Danforth Ave / Lamb Ave'
+    >>> table[2] == SAMPLE_STATIONS[2]
+    True
+    >>> table.get_total(BIKES_AVAILABLE)
+    23
+    >>> table.get_stations_with_n_docks(12)
+    [7486]
+    >>> table.get_station_with_max_bikes()
+    7571
+    """
+
+    def __init__(self, stations: Sequence['Station'] = (),
+                 attributes: Optional['StationAttributes'] = None) -> None:
+        """Initialize a table containing stations, with the kiosk flag of
+        attributes, the StationAttributes of stations (worked out here if it
+        is None).
+        """
+
+        columns = [None] * STATION_WIDTH
+        columns[ID] = array('i')
+        columns[NAME] = []
+        columns[LATITUDE] = array('d')
+        columns[LONGITUDE] = array('d')
+        columns[CAPACITY] = array('i')
+        columns[BIKES_AVAILABLE] = array('i')
+        columns[DOCKS_AVAILABLE] = array('i')
+        columns[IS_RENTING] = bytearray()
+        columns[IS_RETURNING] = bytearray()
+
+        self._columns = columns
+
+        for station in stations:
+            self._append_values(station)
+
+        if attributes is None:
+            attributes = StationAttributes(stations)
+        self.kiosk = bytearray(attributes.flag(KIOSK))
+
+    def __len__(self) -> int:
+        """Return the number of stations in this table."""
+
+        return len(self._columns[ID])
+
+    def __getitem__(self, position: int) -> 'StationRow':
+        """Return a view of the station at position in this table."""
+
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('station position out of range')
+
+        return StationRow(self, position)
+
+    def __iter__(self) -> Iterator['StationRow']:
+        """Return an iterator over views of the stations in this table."""
+
+        return (StationRow(self, position) for position in range(len(self)))
+
+    def column(self, index: int):
+        """Return the column holding the values at index of each station.
+
+        >>> list(StationTable(SAMPLE_STATIONS).column(CAPACITY))
+        [15, 22, 19]
+        """
+
+        return self._columns[index]
+
+    def append(self, station: 'Station') -> None:
+        """Add station to the end of this table.
+
+        >>> table = StationTable()
+        >>> table.append(HANDOUT_STATIONS[1])
+        >>> table[0][IS_RENTING]
+        True
+        """
+
+        self._append_values(station)
+        self.kiosk.append(has_kiosk(station))
+
+    def _append_values(self, station: 'Station') -> None:
+        """Add the values of station to the end of the columns."""
+
+        for index in range(STATION_WIDTH):
+            value = station[index]
+            if index in FLAG_COLUMNS:
+                value = int(bool(value))
+            self._columns[index].append(value)
+
+    def to_list(self) -> List['Station']:
+        """Return the stations in this table as a list of station lists.
+
+        >>> StationTable(HANDOUT_STATIONS).to_list() == HANDOUT_STATIONS
+        True
+        """
+
+        return [list(row) for row in self]
+
+    def get_total(self, index: int) -> int:
+        """Return the sum of the column given by index, like get_total in
+        project2.
+
+        >>> StationTable(SAMPLE_STATIONS).get_total(DOCKS_AVAILABLE)
+        32
+        >>> StationTable().get_total(CAPACITY)
+        0
+        """
+
+        return sum(self._columns[index])
+
+    def get_station_with_max_bikes(self) -> int:
+        """Return the id of the station with the most bikes available, or of
+        the first such station if there is a tie, like
+        get_station_with_max_bikes in project2.
+
+        >>> StationTable(HANDOUT_STATIONS).get_station_with_max_bikes()
+        7000
+        """
+
+        bikes = self._columns[BIKES_AVAILABLE]
+        most_bikes = max(bikes, default=0)
+
+        if most_bikes <= 0:
+            return -1
+
+        return self._columns[ID][bikes.index(most_bikes)]
+
+    def get_stations_with_n_docks(self, num: int) -> List[int]:
+        """Return the ids of the stations with at least num docks available,
+        in the same order as they appear in this table, like
+        get_stations_with_n_docks in project2.
+
+        >>> StationTable(SAMPLE_STATIONS).get_stations_with_n_docks(2)
+        [7090, 7486, 7571]
+        """
+
+        return list(compress(self._columns[ID],
+                             map(num.__le__, self._columns[DOCKS_AVAILABLE])))
+
+
+class StationRow:
+    """A view of one station in a StationTable that can be read and updated
+    with the station index constants, like a station list.
+
+    >>> table = StationTable(SAMPLE_STATIONS)
+    >>> row = table[0]
+    >>> row[BIKES_AVAILABLE] -= 1
+    >>> table.column(BIKES_AVAILABLE)[0]
+    3
+    >>> row # doctest: +NORMALIZE_WHITESPACE
+    [7090, 'Danforth Ave / Lamb Ave', 43.681991, -79.329455, 15, 3, 10,
+     True, True]
+    """
+
+    __slots__ = ('_table', '_position')
+
+    def __init__(self, table: 'StationTable', position: int) -> None:
+        """Initialize a view of the station at position in table."""
+
+        self._table = table
+        self._position = position
+
+    def __len__(self) -> int:
+        """Return the number of values in a station."""
+
+        return STATION_WIDTH
+
+    def __getitem__(self, index: int):
+        """Return the value at index of this station."""
+
+        value = self._table.column(index)[self._position]
+
+        if index in FLAG_COLUMNS:
+            return bool(value)
+
+        return value
+
+    def __setitem__(self, index: int, value) -> None:
+        """Set the value at index of this station to value."""
+
+        if index in FLAG_COLUMNS:
+            value = int(bool(value))
+
+        self._table.column(index)[self._position] = value
+
+        if index == NAME:
+            self._table.kiosk[self._position] = has_kiosk(self)
+
+    def __iter__(self) -> Iterator:
+        """Return an iterator over the values of this station."""
+
+        return (self[index] for index in range(STATION_WIDTH))
+
+    def __eq__(self, other) -> bool:
+        """Return True if and only if other holds the same values as this
+        station.
+        """
+
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        """Return a representation of this station as a station list."""
+
+        return repr(list(self))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
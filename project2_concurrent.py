@@ -0,0 +1,162 @@
+"""Station state shared between threads for project2"""
+#author Muntaqa Mahmood
+
+import copy
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from typing import List, Sequence
+
+from project2 import FAKE_STATIONS
+from project2_constants import (ID, CAPACITY, BIKES_AVAILABLE,
+                                DOCKS_AVAILABLE)
+from project2_registry import StationRegistry
+
+# The number of locks the stations are spread over by default.
+DEFAULT_STRIPES = 64
+
+
+class ConcurrentStations:
+    """Stations that many threads can rent from and return to at once.
+    Each station is guarded by one of a fixed number of locks chosen by its
+    id, so operations on stations with different locks do not wait for
+    each other. Reads of the whole network hold every lock, so they see a
+    consistent state.
+
+    Listeners added to the registry are called while a lock is held and
+    must be safe to call from several threads.
+
+    >>> stations = ConcurrentStations(copy.deepcopy(FAKE_STATIONS), 4)
+    >>> bikes = stations.get_total(BIKES_AVAILABLE)
+    >>> def hammer(seed: int) -> int:
+    ...     rng = random.Random(seed)
+    ...     rented = 0
+    ...     for _ in range(2000):
+    ...         start = rng.choice(FAKE_STATIONS)[ID]
+    ...         end = rng.choice(FAKE_STATIONS)[ID]
+    ...         stations.transfer_bike(start, end)
+    ...         rented += stations.rent_bike(start)
+    ...         rented -= stations.return_bike(end)
+    ...         assert all(station[BIKES_AVAILABLE] + station[DOCKS_AVAILABLE]
+    ...                    == station[CAPACITY]
+    ...                    for station in stations.snapshot())
+    ...     return rented
+    >>> with ThreadPoolExecutor(8) as pool:
+    ...     rented = sum(pool.map(hammer, range(16)))
+    >>> stations.get_total(BIKES_AVAILABLE) == bikes - rented
+    True
+    """
+
+    def __init__(self, stations: Sequence['Station'] = (),
+                 stripes: int = DEFAULT_STRIPES) -> None:
+        """Initialize shared state for stations, spread over stripes locks.
+        """
+
+        self.registry = StationRegistry(stations)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def rent_bike(self, station_id: int) -> bool:
+        """Atomically rent a single bike from the station with id
+        station_id. Return True if and only if the rental was successful.
+        """
+
+        with self._locks[self._stripe(station_id)]:
+            return self.registry.rent_bike(station_id)
+
+    def return_bike(self, station_id: int) -> bool:
+        """Atomically return a single bike to the station with id
+        station_id. Return True if and only if the return was successful.
+        """
+
+        with self._locks[self._stripe(station_id)]:
+            return self.registry.return_bike(station_id)
+
+    def transfer_bike(self, from_id: int, to_id: int) -> bool:
+        """Atomically move a single bike from the station with id from_id to
+        the station with id to_id. Return True if and only if the bike could
+        be both rented from the first station and returned to the second;
+        otherwise neither station is changed.
+
+        >>> stations = ConcurrentStations(copy.deepcopy(FAKE_STATIONS))
+        >>> stations.transfer_bike(1001, 1000)
+        True
+        >>> stations.transfer_bike(1000, 1001)
+        True
+        >>> stations.transfer_bike(1003, 1002)
+        False
+        >>> stations.registry.get_station(1003)[BIKES_AVAILABLE]
+        10
+        """
+
+        stripes = sorted({self._stripe(from_id), self._stripe(to_id)})
+
+        with ExitStack() as stack:
+            for stripe in stripes:
+                stack.enter_context(self._locks[stripe])
+
+            if not self.registry.rent_bike(from_id):
+                return False
+            if self.registry.return_bike(to_id):
+                return True
+
+            # Put the bike back where it came from.
+            self.registry.return_bike(from_id)
+            return False
+
+    def add_station(self, station: 'Station') -> None:
+        """Add station, replacing any station with the same id."""
+
+        with self._all_locks():
+            self.registry.add_station(station)
+
+    def remove_station(self, station_id: int) -> 'Station':
+        """Remove and return the station with id station_id, or the empty
+        list if there is no such station.
+        """
+
+        with self._all_locks():
+            return self.registry.remove_station(station_id)
+
+    def snapshot(self) -> List['Station']:
+        """Return a copy of every station, all taken at the same moment.
+
+        >>> stations = ConcurrentStations(FAKE_STATIONS)
+        >>> stations.snapshot() == FAKE_STATIONS
+        True
+        """
+
+        with self._all_locks():
+            return [station[:] for station in self.registry]
+
+    def get_total(self, index: int) -> int:
+        """Return the sum of the column given by index over all stations, all
+        taken at the same moment.
+
+        >>> ConcurrentStations(FAKE_STATIONS).get_total(CAPACITY)
+        80
+        """
+
+        with self._all_locks():
+            return sum(station[index] for station in self.registry)
+
+    def _stripe(self, station_id: int) -> int:
+        """Return the index of the lock guarding the station with id
+        station_id.
+        """
+
+        return hash(station_id) % len(self._locks)
+
+    def _all_locks(self) -> ExitStack:
+        """Return a context that holds every lock, taken in order."""
+
+        stack = ExitStack()
+        for lock in self._locks:
+            stack.enter_context(lock)
+
+        return stack
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -22,3 +22,24 @@ NORTH = 'NORTH'
 EAST = 'EAST'
 WEST = 'WEST'
 DIRECTIONS = [SOUTH, NORTH, EAST, WEST]
+
+# Changes reported by a StationRegistry to its listeners.
+STATION_ADDED = 'added'
+STATION_REMOVED = 'removed'
+BIKE_RENTED = 'rented'
+BIKE_RETURNED = 'returned'
+STATION_UPDATED = 'updated'
+
+# The kinds of event in a trip log replayed by project2_replay, and the
+# column each value of an event is in.
+RENT_EVENT = 'rent'
+RETURN_EVENT = 'return'
+EVENT_STATION_ID = 0
+EVENT_KIND = 1
+
+# Compact codes for directions, combined with | for directions such as
+# SOUTHWEST.
+NORTH_CODE = 1
+SOUTH_CODE = 2
+EAST_CODE = 4
+WEST_CODE = 8
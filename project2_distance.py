@@ -0,0 +1,227 @@
+"""Batched distance calculations for project2"""
+#author Muntaqa Mahmood
+
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from project2 import SAMPLE_STATIONS, get_distance
+from project2_constants import LATITUDE, LONGITUDE, EARTH_RADIUS
+
+# The number of rows of a distance matrix computed at a time by the
+# chunked functions.
+DEFAULT_CHUNK_SIZE = 256
+
+
+def station_coordinates(stations: List['Station']) -> Tuple[array, array]:
+    """Return the latitudes and longitudes of stations as two arrays of
+    floats, in the same order as stations.
+
+    >>> lats, lons = station_coordinates(SAMPLE_STATIONS)
+    >>> list(lats)
+    [43.681991, 43.684261, 43.671685]
+    >>> len(lons)
+    3
+    """
+
+    return (array('d', [station[LATITUDE] for station in stations]),
+            array('d', [station[LONGITUDE] for station in stations]))
+
+
+def distances_from_point(lat: float, lon: float, lats: Sequence[float],
+                         lons: Sequence[float]) -> array:
+    """Return an array of the distances in kilometres from the location
+    given by lat and lon to each location given by lats and lons. Each
+    distance is exactly what get_distance returns for that pair.
+
+    Precondition: len(lats) == len(lons)
+
+    >>> lats, lons = station_coordinates(SAMPLE_STATIONS)
+    >>> answer = distances_from_point(43.671134, -79.325164, lats, lons)
+    >>> list(answer) == [get_distance(43.671134, -79.325164, lat, lon)
+    ...                  for lat, lon in zip(lats, lons)]
+    True
+    """
+
+    return _distance_rows([lat], [lon], _Points(lats, lons))[0]
+
+
+def distance_matrix(lats1: Sequence[float], lons1: Sequence[float],
+                    lats2: Sequence[float], lons2: Sequence[float]
+                    ) -> List[array]:
+    """Return a list with one array per location given by lats1 and lons1,
+    holding the distances in kilometres from that location to each location
+    given by lats2 and lons2.
+
+    >>> lats, lons = station_coordinates(SAMPLE_STATIONS)
+    >>> matrix = distance_matrix(lats[:1], lons[:1], lats, lons)
+    >>> list(matrix[0])
+    [0.0, 2.435, 1.197]
+    """
+
+    return _distance_rows(lats1, lons1, _Points(lats2, lons2))
+
+
+def iter_distance_matrix(lats1: Sequence[float], lons1: Sequence[float],
+                         lats2: Sequence[float], lons2: Sequence[float],
+                         chunk_size: int = DEFAULT_CHUNK_SIZE
+                         ) -> Iterator[Tuple[int, List[array]]]:
+    """Yield the rows of distance_matrix(lats1, lons1, lats2, lons2) at most
+    chunk_size rows at a time, as (index of first row, rows) tuples, so
+    that only one chunk of the matrix needs to be in memory at once.
+
+    >>> lats, lons = station_coordinates(SAMPLE_STATIONS)
+    >>> [(start, len(rows))
+    ...  for start, rows in iter_distance_matrix(lats, lons, lats, lons, 2)]
+    [(0, 2), (2, 1)]
+    """
+
+    points = _Points(lats2, lons2)
+
+    for start in range(0, len(lats1), chunk_size):
+        stop = start + chunk_size
+        yield start, _distance_rows(lats1[start:stop], lons1[start:stop],
+                                    points)
+
+
+def pairwise_distances(lats: Sequence[float],
+                       lons: Sequence[float]) -> array:
+    """Return the condensed matrix of distances in kilometres between every
+    pair of locations given by lats and lons: the distances from location 0
+    to locations 1, 2, ..., then from location 1 to locations 2, 3, ...,
+    and so on.
+
+    >>> lats, lons = station_coordinates(SAMPLE_STATIONS)
+    >>> list(pairwise_distances(lats, lons))
+    [2.435, 1.197, 2.505]
+    """
+
+    condensed = array('d')
+
+    for _, chunk in iter_pairwise_distances(lats, lons):
+        condensed.extend(chunk)
+
+    return condensed
+
+
+def iter_pairwise_distances(lats: Sequence[float], lons: Sequence[float],
+                            chunk_size: int = DEFAULT_CHUNK_SIZE
+                            ) -> Iterator[Tuple[int, array]]:
+    """Yield the condensed matrix of pairwise_distances(lats, lons) for at
+    most chunk_size locations at a time, as (index into the condensed
+    matrix, distances) tuples.
+
+    >>> lats, lons = station_coordinates(SAMPLE_STATIONS)
+    >>> [(start, list(chunk))
+    ...  for start, chunk in iter_pairwise_distances(lats, lons, 1)]
+    [(0, [2.435, 1.197]), (2, [2.505]), (3, [])]
+    """
+
+    points = _Points(lats, lons)
+    count = len(lats)
+    offset = 0
+
+    for start in range(0, count, chunk_size):
+        chunk = array('d')
+        for row in range(start, min(start + chunk_size, count)):
+            chunk.extend(points.distances_from(lats[row], lons[row], row + 1))
+        yield offset, chunk
+        offset += len(chunk)
+
+
+def distances_between(lats: Sequence[float], lons: Sequence[float],
+                      starts: Sequence[int], ends: Sequence[int]) -> array:
+    """Return an array of the distances in kilometres from location
+    starts[i] to location ends[i], for each i, of the locations given by
+    lats and lons. Each distance is exactly what get_distance returns for
+    that pair.
+
+    Precondition: len(lats) == len(lons) and len(starts) == len(ends)
+
+    >>> lats, lons = station_coordinates(SAMPLE_STATIONS)
+    >>> list(distances_between(lats, lons, [0, 1, 2], [1, 1, 0]))
+    [2.435, 0.0, 1.197]
+    """
+
+    return _Points(lats, lons).distances_between(starts, ends)
+
+
+class _Points:
+    """Locations with the parts of the haversine formula that depend on a
+    single location worked out once.
+    """
+
+    def __init__(self, lats: Sequence[float], lons: Sequence[float]) -> None:
+        self.lats = array('d', map(math.radians, lats))
+        self.lons = array('d', map(math.radians, lons))
+        self.cos_lats = array('d', map(math.cos, self.lats))
+
+    def distances_from(self, lat: float, lon: float, start: int = 0) -> array:
+        """Return the distances from the location given by lat and lon to
+        each of these locations from position start on, computed the same
+        way as get_distance.
+        """
+
+        lat1 = math.radians(lat)
+
+        return array('d', _haversine(lat1, math.radians(lon), math.cos(lat1),
+                                     self.lats[start:], self.lons[start:],
+                                     self.cos_lats[start:]))
+
+    def distances_between(self, starts: Sequence[int],
+                          ends: Sequence[int]) -> array:
+        """Return the distances from location starts[i] to location ends[i]
+        of these locations, for each i, computed the same way as
+        get_distance.
+        """
+
+        # The indexes into starts of the pairs from each location.
+        by_start: Dict[int, List[int]] = {}
+        for index, start in enumerate(starts):
+            by_start.setdefault(start, []).append(index)
+
+        lats, lons, cos_lats = self.lats, self.lons, self.cos_lats
+        distances = array('d', bytes(8 * len(starts)))
+
+        for start, indexes in by_start.items():
+            stops = [ends[index] for index in indexes]
+            for index, distance in zip(indexes, _haversine(
+                    lats[start], lons[start], cos_lats[start],
+                    [lats[stop] for stop in stops],
+                    [lons[stop] for stop in stops],
+                    [cos_lats[stop] for stop in stops])):
+                distances[index] = distance
+
+        return distances
+
+
+def _haversine(lat1: float, lon1: float, cos_lat1: float,
+               lats: Iterable[float], lons: Iterable[float],
+               cos_lats: Iterable[float]) -> List[float]:
+    """Return the distances in kilometres, rounded like get_distance, from
+    the location with latitude lat1 and longitude lon1 in radians to each
+    location given by lats and lons in radians, where cos_lat1 and cos_lats
+    are the cosines of the latitudes.
+    """
+
+    sin, asin, sqrt = math.sin, math.asin, math.sqrt
+
+    return [round(2 * asin(sqrt(sin((lat2 - lat1) / 2) ** 2 +
+                                cos_lat1 * cos_lat2 *
+                                sin((lon2 - lon1) / 2) ** 2)) *
+                  EARTH_RADIUS, 3)
+            for lat2, lon2, cos_lat2 in zip(lats, lons, cos_lats)]
+
+
+def _distance_rows(lats: Sequence[float], lons: Sequence[float],
+                   points: _Points) -> List[array]:
+    """Return the rows of distances from each location given by lats and
+    lons to each of points.
+    """
+
+    return [points.distances_from(lat, lon) for lat, lon in zip(lats, lons)]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
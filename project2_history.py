@@ -0,0 +1,259 @@
+"""Recent availability history of each station for project2"""
+#author Muntaqa Mahmood
+
+import copy
+import math
+import time
+from array import array
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from project2 import SAMPLE_STATIONS
+from project2_constants import (ID, BIKES_AVAILABLE, DOCKS_AVAILABLE,
+                                STATION_REMOVED)
+from project2_registry import StationRegistry
+
+# The number of samples kept for each station by default.
+DEFAULT_HISTORY_SIZE = 1024
+
+
+class WindowSummary(NamedTuple):
+    """What a station's availability was over a window of time: the least
+    and most bikes available, the mean bikes available weighted by time,
+    and for how long the station had no bikes and no docks available.
+    """
+    min_bikes: int
+    max_bikes: int
+    mean_bikes: float
+    time_empty: float
+    time_full: float
+
+
+class AvailabilityHistory:
+    """The bikes and docks available at each station in a StationRegistry
+    each time it changed, kept in a fixed size ring of samples per station
+    so the oldest samples are forgotten first.
+
+    The history listens to the registry, so rents, returns and snapshots
+    applied with apply_snapshot are recorded as they happen. Times come
+    from clock, which must never go backwards. A station's availability is
+    taken to stay as it was sampled until its next sample.
+
+    >>> now = [0.0]
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> history = AvailabilityHistory(registry, clock=lambda: now[0])
+    >>> now[0] = 10.0
+    >>> all(registry.rent_bike(7090) for _ in range(4))
+    True
+    >>> now[0] = 40.0
+    >>> registry.return_bike(7090)
+    True
+    >>> history.window(7090, 0, 60)
+    WindowSummary(min_bikes=0, max_bikes=4, mean_bikes=1.0, time_empty=30.0, \
+time_full=0.0)
+    >>> list(history.downsample(7090, 0, 60, 20))
+    [2.0, 0.0, 1.0]
+    """
+
+    def __init__(self, registry: 'StationRegistry',
+                 size: int = DEFAULT_HISTORY_SIZE,
+                 clock: Callable[[], float] = time.time) -> None:
+        """Initialize the history of the stations in registry, starting
+        with their availability now, keeping at most size samples for each.
+        """
+
+        self._size = size
+        self._clock = clock
+        self._rings: Dict[int, _Ring] = {}
+
+        for station in registry:
+            self.record(station)
+
+        registry.add_listener(self.update)
+
+    def __contains__(self, station_id: int) -> bool:
+        """Return True if and only if there is history for the station with
+        id station_id.
+        """
+
+        return station_id in self._rings
+
+    def update(self, change: str, station: 'Station') -> None:
+        """Record the availability of station after change was made to it in
+        the registry. This is called by the registry. The history of
+        removed stations is kept until forgotten.
+        """
+
+        if change != STATION_REMOVED:
+            self.record(station)
+
+    def record(self, station: 'Station') -> None:
+        """Record the bikes and docks available at station now."""
+
+        ring = self._rings.get(station[ID])
+        if ring is None:
+            ring = self._rings[station[ID]] = _Ring(self._size)
+
+        ring.append(self._clock(), station[BIKES_AVAILABLE],
+                    station[DOCKS_AVAILABLE])
+
+    def forget(self, station_id: int) -> None:
+        """Forget the history of the station with id station_id."""
+
+        self._rings.pop(station_id, None)
+
+    def samples(self, station_id: int) -> List[Tuple[float, int, int]]:
+        """Return the (time, bikes, docks) samples kept for the station with
+        id station_id, oldest first.
+
+        >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+        >>> history = AvailabilityHistory(registry, size=2, clock=lambda: 5.0)
+        >>> registry.rent_bike(7571) and registry.rent_bike(7571)
+        True
+        >>> history.samples(7571)
+        [(5.0, 13, 6), (5.0, 12, 7)]
+        """
+
+        ring = self._rings.get(station_id)
+
+        return list(ring.samples(0, ring.count)) if ring else []
+
+    def window(self, station_id: int, start: float,
+               end: Optional[float] = None) -> Optional[WindowSummary]:
+        """Return a summary of the availability of the station with id
+        station_id from time start up to time end, or up to now if end is
+        None. Return None if nothing is known about the station in that
+        window.
+        """
+
+        if end is None:
+            end = self._clock()
+
+        low = high = None
+        weighted = empty = full = covered = 0.0
+
+        for begin, finish, bikes, docks in self._segments(station_id, start,
+                                                          end):
+            duration = finish - begin
+            low = bikes if low is None else min(low, bikes)
+            high = bikes if high is None else max(high, bikes)
+            weighted += bikes * duration
+            covered += duration
+            if bikes == 0:
+                empty += duration
+            if docks == 0:
+                full += duration
+
+        if low is None:
+            return None
+
+        mean = weighted / covered if covered else float(high)
+
+        return WindowSummary(low, high, mean, empty, full)
+
+    def downsample(self, station_id: int, start: float, end: float,
+                   step: float) -> array:
+        """Return the mean bikes available at the station with id station_id,
+        weighted by time, in each step long interval from time start up to
+        time end, with nan for intervals nothing is known about.
+
+        Precondition: step > 0
+        """
+
+        buckets = max(0, math.ceil((end - start) / step))
+        weighted = array('d', bytes(8 * buckets))
+        covered = array('d', bytes(8 * buckets))
+
+        for begin, finish, bikes, _ in self._segments(station_id, start, end):
+            bucket = min(int((begin - start) // step), buckets - 1)
+            while begin < finish:
+                bucket_end = min(finish, start + (bucket + 1) * step)
+                weighted[bucket] += bikes * (bucket_end - begin)
+                covered[bucket] += bucket_end - begin
+                begin = bucket_end
+                bucket += 1
+
+        return array('d', [total / length if length else math.nan
+                           for total, length in zip(weighted, covered)])
+
+    def _segments(self, station_id: int, start: float,
+                  end: float) -> Iterator[Tuple[float, float, int, int]]:
+        """Yield the (begin, end, bikes, docks) stretches of time between
+        start and end over which the station with id station_id had the
+        same availability. Samples taken at the same time give stretches
+        of no length.
+        """
+
+        ring = self._rings.get(station_id)
+        if ring is None or start > end:
+            return
+
+        # Start from the last sample taken at or before start, which still
+        # holds at start, and stop at the last one taken at or before end.
+        first = max(0, ring.count_at_or_before(start) - 1)
+        samples = list(ring.samples(first, ring.count_at_or_before(end)))
+
+        for position, (when, bikes, docks) in enumerate(samples):
+            until = (samples[position + 1][0] if position + 1 < len(samples)
+                     else end)
+            yield max(when, start), min(until, end), bikes, docks
+
+
+class _Ring:
+    """A fixed number of the most recent (time, bikes, docks) samples of one
+    station, stored in typed arrays.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._times = array('d', bytes(8 * size))
+        self._bikes = array('i', bytes(4 * size))
+        self._docks = array('i', bytes(4 * size))
+        self._size = size
+        self._start = 0
+        self.count = 0
+
+    def append(self, when: float, bikes: int, docks: int) -> None:
+        """Add a sample, forgetting the oldest one if the ring is full."""
+
+        if self.count < self._size:
+            slot = (self._start + self.count) % self._size
+            self.count += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self._size
+
+        self._times[slot] = when
+        self._bikes[slot] = bikes
+        self._docks[slot] = docks
+
+    def time(self, position: int) -> float:
+        """Return the time of the sample at position, oldest first."""
+
+        return self._times[(self._start + position) % self._size]
+
+    def count_at_or_before(self, when: float) -> int:
+        """Return the number of samples taken at or before time when."""
+
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.time(middle) <= when:
+                low = middle + 1
+            else:
+                high = middle
+
+        return low
+
+    def samples(self, first: int,
+                last: int) -> Iterator[Tuple[float, int, int]]:
+        """Yield the samples at positions first up to but not including
+        last, oldest first.
+        """
+
+        for position in range(first, min(last, self.count)):
+            slot = (self._start + position) % self._size
+            yield self._times[slot], self._bikes[slot], self._docks[slot]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
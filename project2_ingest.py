@@ -0,0 +1,131 @@
+"""Applying new station status snapshots as changes for project2"""
+#author Muntaqa Mahmood
+
+import copy
+import io
+from typing import Callable, Dict, Iterable, List, Optional, TextIO
+
+from project2 import SAMPLE_STATIONS
+from project2_constants import (ID, BIKES_AVAILABLE, DOCKS_AVAILABLE,
+                                IS_RENTING)
+from project2_loader import iter_station_records
+from project2_registry import StationRegistry
+
+
+class ChangeSet:
+    """The changes made to a StationRegistry by one snapshot: the ids of the
+    stations added and removed, and for each station updated the indexes of
+    the values that changed.
+
+    >>> changes = ChangeSet()
+    >>> changes.is_empty()
+    True
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty set of changes."""
+
+        self.added: List[int] = []
+        self.removed: List[int] = []
+        self.updated: Dict[int, List[int]] = {}
+
+    def __repr__(self) -> str:
+        """Return a representation of these changes."""
+
+        return 'ChangeSet(added={}, removed={}, updated={})'.format(
+            self.added, self.removed, self.updated)
+
+    def is_empty(self) -> bool:
+        """Return True if and only if no station changed."""
+
+        return not (self.added or self.removed or self.updated)
+
+    def changed_ids(self) -> List[int]:
+        """Return the ids of every station added, removed or updated."""
+
+        return self.added + self.removed + list(self.updated)
+
+    def updated_ids(self, index: int) -> List[int]:
+        """Return the ids of the updated stations whose value at index
+        changed.
+
+        >>> changes = ChangeSet()
+        >>> changes.updated = {7090: [BIKES_AVAILABLE, DOCKS_AVAILABLE]}
+        >>> changes.updated_ids(DOCKS_AVAILABLE), changes.updated_ids(ID)
+        ([7090], [])
+        """
+
+        return [station_id for station_id, indexes in self.updated.items()
+                if index in indexes]
+
+
+def apply_snapshot(registry: 'StationRegistry',
+                   stations: Iterable['Station']) -> ChangeSet:
+    """Make registry hold the same stations as stations, a complete and
+    newer snapshot of the network, and return what changed. Stations that
+    are new are added, stations missing from the snapshot are removed, and
+    only the values that differ are updated in the rest, so listeners on
+    registry only hear about the stations that changed.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> snapshot = copy.deepcopy(SAMPLE_STATIONS[:2])
+    >>> snapshot[0][BIKES_AVAILABLE], snapshot[0][DOCKS_AVAILABLE] = 3, 11
+    >>> snapshot.append([7000, 'Ft. York / Capreol Crt.',
+    ...                  43.639832, -79.395954, 31, 20, 11, True, True])
+    >>> apply_snapshot(registry, snapshot)
+    ChangeSet(added=[7000], removed=[7571], updated={7090: [5, 6]})
+    >>> registry.get_station_info(7090)
+    ['Danforth Ave / Lamb Ave', 3, 11, True]
+    >>> apply_snapshot(registry, snapshot).is_empty()
+    True
+    """
+
+    changes = ChangeSet()
+    seen = set()
+
+    for station in stations:
+        station_id = station[ID]
+        seen.add(station_id)
+        current = registry.get_station(station_id)
+
+        if not current:
+            registry.add_station(station)
+            changes.added.append(station_id)
+
+        elif current != station:
+            indexes = [index for index in range(len(station))
+                       if current[index] != station[index]]
+            registry.update_station(station_id,
+                                    {index: station[index]
+                                     for index in indexes})
+            changes.updated[station_id] = indexes
+
+    for station in registry.stations():
+        if station[ID] not in seen:
+            registry.remove_station(station[ID])
+            changes.removed.append(station[ID])
+
+    return changes
+
+
+def ingest_csv(csv_file: TextIO, registry: 'StationRegistry',
+               schema: Optional[Dict[int, Callable]] = None) -> ChangeSet:
+    """Apply the stations in the open CSV file csv_file, loaded as by
+    iter_station_records with schema, to registry as a new snapshot, and
+    return what changed.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS[:1]))
+    >>> csv_file = io.StringIO(
+    ...     'id,name,lat,lon,capacity,bikes,docks,renting,returning\\n'
+    ...     '7090,Danforth Ave / Lamb Ave,43.681991,-79.329455,15,4,10,'
+    ...     'False,True\\n')
+    >>> ingest_csv(csv_file, registry).updated_ids(IS_RENTING)
+    [7090]
+    """
+
+    return apply_snapshot(registry, iter_station_records(csv_file, schema))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
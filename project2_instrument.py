@@ -0,0 +1,322 @@
+"""Opt-in instrumentation of the station functions in project2"""
+#author Muntaqa Mahmood
+
+import functools
+import inspect
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Sequence
+
+import project2
+from project2_constants import BIKES_AVAILABLE
+
+# The functions in project2 that are instrumented by default.
+INSTRUMENTED_FUNCTIONS = (
+    'csv_to_list', 'clean_data', 'get_station', 'get_station_info',
+    'get_total', 'get_station_with_max_bikes', 'get_stations_with_n_docks',
+    'get_direction', 'get_nearest_station', 'rent_bike', 'return_bike',
+    'balance_all_bikes', 'calculate_target_percentage')
+
+# The number of latencies kept for each function by default.
+DEFAULT_SAMPLE_SIZE = 1024
+
+# The latency percentiles reported.
+PERCENTILES = (50, 90, 99)
+
+# The prefix of every Prometheus metric name.
+METRIC_PREFIX = 'project2'
+
+
+class FunctionStats:
+    """What has been measured about calls to one function: the number of
+    calls, their total time in seconds, the latencies of the most recent
+    calls, and the stations scanned and bikes moved by them.
+
+    >>> stats = FunctionStats(3)
+    >>> for seconds in [0.4, 0.1, 0.2, 0.3]:
+    ...     stats.record(seconds)
+    >>> stats.calls, round(stats.seconds, 2), stats.percentile(50)
+    (4, 1.0, 0.2)
+    """
+
+    def __init__(self, sample_size: int = DEFAULT_SAMPLE_SIZE) -> None:
+        """Initialize statistics that keep the latencies of the last
+        sample_size calls.
+        """
+
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows_scanned = 0
+        self.bikes_moved = 0
+        self._samples = array('d', bytes(8 * sample_size))
+        self._sample_size = sample_size
+
+    def record(self, seconds: float) -> None:
+        """Record a call that took seconds."""
+
+        self._samples[self.calls % self._sample_size] = seconds
+        self.calls += 1
+        self.seconds += seconds
+
+    def percentile(self, percent: float) -> float:
+        """Return the latency that percent percent of the recent calls took
+        at most, or 0.0 if there have been no calls.
+        """
+
+        latencies = sorted(self._samples[:min(self.calls, self._sample_size)])
+        if not latencies:
+            return 0.0
+
+        rank = max(0, -(-len(latencies) * percent // 100) - 1)
+
+        return latencies[int(rank)]
+
+    def to_dict(self) -> Dict[str, float]:
+        """Return these statistics as a dict."""
+
+        stats = {'calls': self.calls, 'seconds': self.seconds}
+        for percent in PERCENTILES:
+            stats['p{}'.format(percent)] = self.percentile(percent)
+        stats['rows_scanned'] = self.rows_scanned
+        stats['bikes_moved'] = self.bikes_moved
+
+        return stats
+
+
+class Instrumentation:
+    """Call counts, latencies and work done by the functions in project2,
+    measured while enabled.
+
+    Enabling replaces the functions in the project2 module with measuring
+    wrappers, and disabling puts the originals back, so nothing is added to
+    the functions while disabled. Calls between functions in project2 are
+    measured too, but code that imported a function with from project2
+    import ... before enabling keeps calling the original.
+
+    If a profiler is given, such as a cProfile.Profile, it is enabled for
+    every profile_every-th call to a measured function.
+
+    >>> instruments = Instrumentation()
+    >>> with instruments:
+    ...     project2.get_station_info(7571, project2.SAMPLE_STATIONS)
+    ['Highfield Rd / Gerrard St E - SMART', 14, 5, False]
+    >>> stats = instruments.stats()
+    >>> stats['get_station_info']['calls'], stats['get_station']['calls']
+    (1, 1)
+    >>> stats['get_station']['rows_scanned']
+    3
+    >>> with instruments:
+    ...     project2.get_total(stations=project2.SAMPLE_STATIONS,
+    ...                        index=BIKES_AVAILABLE)
+    23
+    >>> instruments.stats()['get_total']['rows_scanned']
+    3
+    >>> project2.get_station is instruments.original('get_station')
+    True
+    """
+
+    def __init__(self, functions: Sequence[str] = INSTRUMENTED_FUNCTIONS,
+                 sample_size: int = DEFAULT_SAMPLE_SIZE,
+                 profiler: Optional[object] = None,
+                 profile_every: int = 100) -> None:
+        """Initialize disabled instrumentation of the functions in project2
+        named in functions, keeping the latencies of the last sample_size
+        calls to each.
+        """
+
+        self._functions = tuple(functions)
+        self._originals: Dict[str, Callable] = {}
+        self._stats = {name: FunctionStats(sample_size)
+                       for name in self._functions}
+        self._profiler = profiler
+        self._profile_every = profile_every
+        self._profiling = False
+        self._calls = 0
+
+    def __enter__(self) -> 'Instrumentation':
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def is_enabled(self) -> bool:
+        """Return True if and only if the functions are being measured."""
+
+        return bool(self._originals)
+
+    def enable(self) -> None:
+        """Start measuring the functions."""
+
+        if self._originals:
+            return
+
+        for name in self._functions:
+            original = getattr(project2, name)
+            self._originals[name] = original
+            setattr(project2, name, self._wrap(name, original))
+
+    def disable(self) -> None:
+        """Stop measuring the functions and put the originals back."""
+
+        for name, original in self._originals.items():
+            setattr(project2, name, original)
+
+        self._originals.clear()
+
+    def original(self, name: str) -> Callable:
+        """Return the function in project2 named name as it is when not
+        being measured.
+        """
+
+        return self._originals.get(name, getattr(project2, name))
+
+    def reset(self) -> None:
+        """Forget everything measured so far."""
+
+        for name, stats in self._stats.items():
+            self._stats[name] = FunctionStats(stats._sample_size)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Return, for each measured function, its FunctionStats as a dict.
+        """
+
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
+
+    def prometheus(self) -> str:
+        """Return the measurements in the Prometheus text exposition format.
+
+        >>> instruments = Instrumentation(['get_total'])
+        >>> with instruments:
+        ...     project2.get_total(BIKES_AVAILABLE, project2.SAMPLE_STATIONS)
+        23
+        >>> print(instruments.prometheus()) # doctest: +ELLIPSIS
+        # TYPE project2_calls_total counter
+        project2_calls_total{function="get_total"} 1
+        # TYPE project2_seconds_total counter
+        project2_seconds_total{function="get_total"} ...
+        # TYPE project2_latency_seconds summary
+        project2_latency_seconds{function="get_total",quantile="0.5"} ...
+        project2_latency_seconds{function="get_total",quantile="0.9"} ...
+        project2_latency_seconds{function="get_total",quantile="0.99"} ...
+        # TYPE project2_rows_scanned_total counter
+        project2_rows_scanned_total{function="get_total"} 3
+        # TYPE project2_bikes_moved_total counter
+        project2_bikes_moved_total{function="get_total"} 0
+        """
+
+        lines = []
+        metrics = (('calls_total', 'counter', 'calls'),
+                   ('seconds_total', 'counter', 'seconds'),
+                   ('latency_seconds', 'summary', None),
+                   ('rows_scanned_total', 'counter', 'rows_scanned'),
+                   ('bikes_moved_total', 'counter', 'bikes_moved'))
+
+        for metric, kind, attribute in metrics:
+            name = '{}_{}'.format(METRIC_PREFIX, metric)
+            lines.append('# TYPE {} {}'.format(name, kind))
+
+            for function, stats in self._stats.items():
+                if attribute is not None:
+                    lines.append('{}{{function="{}"}} {}'.format(
+                        name, function, getattr(stats, attribute)))
+                    continue
+
+                for percent in PERCENTILES:
+                    lines.append('{}{{function="{}",quantile="{}"}} {}'.format(
+                        name, function, percent / 100,
+                        stats.percentile(percent)))
+
+        return '\n'.join(lines)
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        """Return a function that calls function and measures the call in
+        the statistics for name.
+        """
+
+        stats = self._stats[name]
+        attribute, measure_before, measure_after = _WORK.get(
+            name, (None, None, None))
+        signature = inspect.signature(function) if attribute else None
+
+        @functools.wraps(function)
+        def measured(*args, **kwargs):
+            self._calls += 1
+            profile = (self._profiler is not None and not self._profiling
+                       and self._calls % self._profile_every == 0)
+            if profile:
+                self._profiling = True
+                self._profiler.enable()
+
+            stations = (signature.bind(*args, **kwargs).arguments['stations']
+                        if signature is not None else None)
+            before = measure_before(stations) if measure_before else None
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                stats.record(time.perf_counter() - start)
+                if profile:
+                    self._profiler.disable()
+                    self._profiling = False
+
+            if measure_after is not None:
+                setattr(stats, attribute, getattr(stats, attribute)
+                        + measure_after(stations, result, before))
+
+            return result
+
+        return measured
+
+
+def _stations_scanned(stations: List['Station'], result: object,
+                      before: None) -> int:
+    """Return the number of stations scanned by a call to a function that
+    looks at every station in stations.
+    """
+
+    return len(stations)
+
+
+def _station_position(stations: List['Station'], result: 'Station',
+                      before: None) -> int:
+    """Return the number of stations a call to get_station on stations
+    scanned to find result.
+    """
+
+    for position, station in enumerate(stations):
+        if station is result:
+            return position + 1
+
+    return len(stations)
+
+
+def _bikes_at_stations(stations: List['Station']) -> List[int]:
+    """Return the bikes at each station in stations."""
+
+    return [station[BIKES_AVAILABLE] for station in stations]
+
+
+def _bikes_moved(stations: List['Station'], result: int,
+                 before: List[int]) -> int:
+    """Return the number of bikes taken from or brought to stations by a
+    call to balance_all_bikes, given the bikes at each station before the
+    call.
+    """
+
+    return sum(abs(station[BIKES_AVAILABLE] - bikes)
+               for station, bikes in zip(stations, before))
+
+
+# For each function whose work is measured, the statistic it adds to, how
+# to measure before a call (or None), and how to measure the work done.
+_WORK = {'get_station': ('rows_scanned', None, _station_position),
+         'get_nearest_station': ('rows_scanned', None, _stations_scanned),
+         'get_total': ('rows_scanned', None, _stations_scanned),
+         'balance_all_bikes': ('bikes_moved', _bikes_at_stations,
+                               _bikes_moved)}
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
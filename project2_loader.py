@@ -0,0 +1,266 @@
+"""Streaming, typed loading of station CSV files for project2"""
+#author Muntaqa Mahmood
+
+import io
+import re
+from itertools import islice
+from typing import (Callable, Dict, Iterator, List, Optional, Sequence,
+                    TextIO, Tuple)
+
+from project2 import is_number
+from project2_attributes import StationAttributes
+from project2_constants import (ID, NAME, LATITUDE, LONGITUDE, CAPACITY,
+                                BIKES_AVAILABLE, DOCKS_AVAILABLE, IS_RENTING,
+                                IS_RETURNING)
+
+# Strings that clean_data always turns into the same value.
+_KNOWN_VALUES = {'': None, 'null': None, 'True': True, 'true': True,
+                 'False': False, 'false': False}
+
+# The most digits a whole number can have and still be converted exactly
+# the same way by int() as by int(float()).
+_MAX_EXACT_DIGITS = 15
+
+# The number of lines converted together by iter_station_records.
+BATCH_SIZE = 1024
+
+_UNKNOWN = object()
+
+# Matches a column of values joined by commas, with a trailing comma, when
+# every value is a plain decimal number that float() reads the same way
+# is_number does.
+_DECIMAL_COLUMN = re.compile(r'(?:[-+]?(?:[0-9]+\.?[0-9]*|\.[0-9]+),)*')
+
+# Matches a column of values each followed by a newline when every value
+# contains an ASCII letter and is not 'True', 'False' or 'null' in any case,
+# so that clean_data would leave every value as it is.
+_TEXT_COLUMN = re.compile(
+    r'(?:(?!(?i:true|false|null)\n)[^\n]*[A-Za-z][^\n]*\n)*')
+
+
+def convert_value(value: str):
+    """Return value converted by the same rules as clean_data: an int iff
+    it represents a whole number, a float iff it represents a number that
+    is not whole, True or False iff it is 'True' or 'False'
+    (case-insensitive), None iff it is 'null' or the empty string, and
+    value itself otherwise.
+
+    >>> [convert_value(value) for value in ['abc', '123', '45.6', 'true']]
+    ['abc', 123, 45.6, True]
+    >>> [convert_value(value) for value in ['FALSE', '3.0', '+4', 'NULL', '']]
+    [False, 3, 4, None, None]
+    """
+
+    known = _KNOWN_VALUES.get(value, _UNKNOWN)
+    if known is not _UNKNOWN:
+        return known
+
+    if _is_short_whole_number(value):
+        return int(value)
+
+    if is_number(value):
+        number = float(value)
+        return int(number) if number % 1 == 0 else number
+
+    if value.lower() == 'null':
+        return None
+
+    folded = value.casefold()
+    if folded == 'true':
+        return True
+    if folded == 'false':
+        return False
+
+    return value
+
+
+def to_int(value: str):
+    """Return value as an int, without checking for other types, when it is
+    made up only of the digits 0 to 9. Otherwise, convert it like
+    convert_value.
+
+    >>> to_int('15'), to_int('15.0'), to_int('')
+    (15, 15, None)
+    """
+
+    if _is_short_whole_number(value):
+        return int(value)
+
+    return convert_value(value)
+
+
+def to_bool(value: str):
+    """Return value as a bool, without checking for numbers, when it is
+    'True' or 'False' (case-insensitive). Otherwise, convert it like
+    convert_value.
+
+    >>> to_bool('True'), to_bool('FALSE'), to_bool('null')
+    (True, False, None)
+    """
+
+    folded = value.casefold()
+    if folded == 'true':
+        return True
+    if folded == 'false':
+        return False
+
+    return convert_value(value)
+
+
+def to_text(value: str) -> str:
+    """Return value unchanged. Use this for columns that are known to hold
+    text, so that no conversion is attempted.
+
+    >>> to_text('123')
+    '123'
+    """
+
+    return value
+
+
+# The types of the columns of a station CSV file. NAME is always kept as
+# text, even if a name looks like a number or is 'null'.
+STATION_SCHEMA = {
+    ID: to_int,
+    NAME: to_text,
+    LATITUDE: convert_value,
+    LONGITUDE: convert_value,
+    CAPACITY: to_int,
+    BIKES_AVAILABLE: to_int,
+    DOCKS_AVAILABLE: to_int,
+    IS_RENTING: to_bool,
+    IS_RETURNING: to_bool
+}
+
+
+def iter_station_records(csv_file: TextIO,
+                         schema: Optional[Dict[int, Callable]] = None,
+                         batch_size: int = BATCH_SIZE,
+                         header: bool = True) -> Iterator[list]:
+    """Yield the values from each line of the open CSV file csv_file, after
+    the header if header is True, as one list per line. Each value is
+    converted by the function schema gives for its column, or by
+    convert_value (the clean_data rules) if schema is None or does not
+    include that column.
+
+    Lines are read and converted batch_size at a time, a column at a time,
+    so at most one batch of the file is in memory at once.
+
+    >>> csv_file = io.StringIO('id,name,lat,renting\\n'
+    ...                        '7090,Danforth Ave / Lamb Ave,43.68,True\\n'
+    ...                        '7486,null,43.0,false\\n')
+    >>> list(iter_station_records(csv_file))
+    [[7090, 'Danforth Ave / Lamb Ave', 43.68, True], [7486, None, 43, False]]
+    """
+
+    if header:
+        csv_file.readline()  # read and discard header
+
+    while True:
+        rows = [line.strip().split(',')
+                for line in islice(csv_file, batch_size)]
+        if not rows:
+            return
+
+        yield from _convert_rows(rows, schema or {})
+
+
+def load_stations(csv_file: TextIO,
+                  schema: Optional[Dict[int, Callable]] = None) -> List[list]:
+    """Return the values from each line of the open CSV file csv_file, after
+    the header, converted as in iter_station_records. Without a schema,
+    this gives the same result as csv_to_list followed by clean_data.
+
+    >>> csv_file = io.StringIO('id,name\\n1,x\\n')
+    >>> load_stations(csv_file, STATION_SCHEMA)
+    [[1, 'x']]
+    """
+
+    return list(iter_station_records(csv_file, schema))
+
+
+def load_station_attributes(csv_file: TextIO,
+                            schema: Optional[Dict[int, Callable]] = None
+                            ) -> Tuple[List[list], 'StationAttributes']:
+    """Return the stations in the open CSV file csv_file, loaded as by
+    load_stations, and their StationAttributes, worked out once as they
+    are loaded so that indexes and tables built from the stations can
+    share them.
+
+    >>> csv_file = io.StringIO('id,name,lat,lon\\n'
+    ...                        '1,Bay St - SMART,43.6,-79.3\\n'
+    ...                        '2,King St,43.7,-79.4\\n')
+    >>> stations, attributes = load_station_attributes(csv_file,
+    ...                                                STATION_SCHEMA)
+    >>> attributes.select(attributes.flag('kiosk'))
+    [2]
+    """
+
+    stations = load_stations(csv_file, schema)
+
+    return stations, StationAttributes(stations)
+
+
+def _convert_rows(rows: List[List[str]],
+                  schema: Dict[int, Callable]) -> List[list]:
+    """Return rows with each value converted by the function schema gives
+    for its column, or by convert_value.
+    """
+
+    if len(set(map(len, rows))) > 1:
+        return [[schema.get(column, convert_value)(value)
+                 for column, value in enumerate(row)] for row in rows]
+
+    columns = [_convert_column(column, schema.get(index, convert_value))
+               for index, column in enumerate(zip(*rows))]
+
+    return list(map(list, zip(*columns)))
+
+
+def _convert_column(column: Tuple[str, ...], convert: Callable) -> Sequence:
+    """Return the values in column converted by convert. Columns made up
+    only of plain whole numbers, plain decimal numbers, values in
+    _KNOWN_VALUES or plain text are converted all at once when convert
+    follows the clean_data rules.
+    """
+
+    if convert is to_text:
+        return column
+
+    if convert not in (convert_value, to_int, to_bool):
+        return list(map(convert, column))
+
+    first = column[0]
+
+    if first in _KNOWN_VALUES and _KNOWN_VALUES.keys() >= set(column):
+        return list(map(_KNOWN_VALUES.__getitem__, column))
+
+    if _is_short_whole_number(first):
+        joined = ''.join(column)
+        if (joined.isascii() and joined.isdigit()
+                and 0 < min(map(len, column))
+                and max(map(len, column)) <= _MAX_EXACT_DIGITS):
+            return list(map(int, column))
+
+    if _DECIMAL_COLUMN.fullmatch(','.join(column) + ','):
+        return [int(number) if number % 1 == 0 else number
+                for number in map(float, column)]
+
+    if _TEXT_COLUMN.fullmatch('\n'.join(column) + '\n'):
+        return column
+
+    return list(map(convert, column))
+
+
+def _is_short_whole_number(value: str) -> bool:
+    """Return True if and only if value is made up only of the digits 0 to
+    9 and is short enough to be converted exactly by int().
+    """
+
+    return (value.isascii() and value.isdigit()
+            and len(value) <= _MAX_EXACT_DIGITS)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,213 @@
+"""Parsing large CSV files in parallel for project2"""
+#author Muntaqa Mahmood
+
+import io
+import locale
+import os
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from project2 import csv_to_list, clean_data
+from project2_loader import iter_station_records
+
+# The number of bytes of a file parsed together by default.
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+# The number of bytes read at a time while looking for the end of a header.
+_SCAN_BYTES = 64 * 1024
+
+
+class ParseStats:
+    """Counts of what has been parsed so far: the number of lines, bytes
+    and chunks, and how long it has taken.
+    """
+
+    def __init__(self) -> None:
+        """Initialize counts for parsing that has not started."""
+
+        self.rows = 0
+        self.bytes = 0
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    def rows_per_second(self) -> float:
+        """Return the number of lines parsed per second so far."""
+
+        elapsed = time.perf_counter() - self.started
+
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+
+def chunk_ranges(path: str,
+                 chunk_bytes: int = DEFAULT_CHUNK_BYTES
+                 ) -> List[Tuple[int, int]]:
+    """Return the (start, end) byte ranges, each about chunk_bytes long, that
+    the lines of the CSV file at path after its header are split into.
+    Every range but the last ends just after a b'\\n', so no line is split
+    between ranges. A file whose lines end with b'\\r' alone is one range.
+
+    >>> path = os.path.join(tempfile.mkdtemp(), 'stations.csv')
+    >>> with open(path, 'wb') as csv_file:
+    ...     _ = csv_file.write(b'id,name\\r\\n1,a\\r\\n2,b\\r\\n3,c\\r\\n')
+    >>> chunk_ranges(path, 4)
+    [(9, 14), (14, 19), (19, 24)]
+    """
+
+    with open(path, 'rb') as binary_file:
+        size = os.fstat(binary_file.fileno()).st_size
+        start = _header_end(binary_file)
+        ranges = []
+
+        while start < size:
+            end = min(size, start + chunk_bytes)
+            if end < size:
+                binary_file.seek(end - 1)
+                end += len(binary_file.readline()) - 1
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+
+def iter_parallel_records(paths: Iterable[str],
+                          schema: Optional[Dict[int, Callable]] = None,
+                          workers: Optional[int] = None,
+                          chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+                          ordered: bool = True,
+                          stats: Optional[ParseStats] = None,
+                          encoding: Optional[str] = None) -> Iterator[list]:
+    """Yield the values from each line after the header of each CSV file
+    in paths, converted as by iter_station_records with schema.
+
+    Each file is split into chunks of about chunk_bytes by chunk_ranges,
+    and the chunks are parsed by workers processes (or one per core if
+    workers is None). If ordered is True, lines are yielded in the same
+    order as the files and the lines in them, exactly as parsing each file
+    in turn with iter_station_records would; otherwise the lines of each
+    chunk are yielded as soon as it is parsed. Files are read with
+    encoding, or the default encoding used by open if it is None, with the
+    same newline handling as open. If stats is given, it is updated as
+    chunks are parsed.
+
+    Precondition: each file in paths is encoded in UTF-8 or another
+    encoding in which b'\\n' only ever ends a line.
+
+    >>> path = os.path.join(tempfile.mkdtemp(), 'stations.csv')
+    >>> with open(path, 'w', newline='') as csv_file:
+    ...     _ = csv_file.write('id,lat,renting\\r\\n7090,43.68,True\\r\\n'
+    ...                        '7486,null,false\\r\\n')
+    >>> stats = ParseStats()
+    >>> list(iter_parallel_records([path], workers=1, chunk_bytes=1,
+    ...                            stats=stats))
+    [[7090, 43.68, True], [7486, None, False]]
+    >>> stats.rows, stats.chunks
+    (2, 2)
+    >>> with open(path) as csv_file:
+    ...     data = csv_to_list(csv_file)
+    >>> clean_data(data)
+    >>> data == list(iter_parallel_records([path], workers=1, chunk_bytes=1))
+    True
+    """
+
+    if encoding is None:
+        encoding = locale.getpreferredencoding(False)
+    workers = workers or os.cpu_count() or 1
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+
+        for path in paths:
+            for start, end in chunk_ranges(path, chunk_bytes):
+                pending.append(pool.submit(_parse_range, path, start, end,
+                                           schema, encoding))
+                # Keep only a few parsed chunks waiting to be yielded.
+                if len(pending) >= 2 * workers:
+                    yield from _finished(pending, ordered, stats)
+
+        while pending:
+            yield from _finished(pending, ordered, stats)
+
+
+def load_files(paths: Iterable[str],
+               schema: Optional[Dict[int, Callable]] = None,
+               workers: Optional[int] = None,
+               chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> List[list]:
+    """Return the values from each line after the header of each CSV file
+    in paths, in order, parsed in parallel as by iter_parallel_records.
+    """
+
+    return list(iter_parallel_records(paths, schema, workers, chunk_bytes))
+
+
+def _finished(pending: deque, ordered: bool,
+              stats: Optional[ParseStats]) -> List[list]:
+    """Return the lines parsed by one of the futures in pending, removing it
+    from pending: the first one if ordered is True, or else whichever
+    finishes first.
+    """
+
+    if ordered:
+        future = pending.popleft()
+    else:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        future = next(iter(done))
+        pending.remove(future)
+
+    records, size = future.result()
+    if stats is not None:
+        stats.rows += len(records)
+        stats.bytes += size
+        stats.chunks += 1
+
+    return records
+
+
+def _parse_range(path: str, start: int, end: int,
+                 schema: Optional[Dict[int, Callable]],
+                 encoding: str) -> Tuple[List[list], int]:
+    """Return the converted values from each line in bytes start up to end
+    of the file at path, and the number of bytes read.
+    """
+
+    with open(path, 'rb') as binary_file:
+        binary_file.seek(start)
+        data = binary_file.read(end - start)
+
+    text_file = io.StringIO(data.decode(encoding), newline=None)
+
+    return list(iter_station_records(text_file, schema, header=False)), \
+        len(data)
+
+
+def _header_end(binary_file) -> int:
+    """Return the position just after the first line of binary_file, which
+    may end with b'\\n', b'\\r\\n' or b'\\r'.
+    """
+
+    position = 0
+    binary_file.seek(0)
+
+    while True:
+        block = binary_file.read(_SCAN_BYTES)
+        if not block:
+            return position
+
+        ends = [end for end in (block.find(b'\r'), block.find(b'\n'))
+                if end != -1]
+        if ends:
+            end = position + min(ends) + 1
+            if block[min(ends)] == ord('\r'):
+                binary_file.seek(end)
+                if binary_file.read(1) == b'\n':
+                    end += 1
+            return end
+
+        position += len(block)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,274 @@
+"""Id-indexed station registry for project2"""
+#author Muntaqa Mahmood
+
+import copy
+from typing import Any, Callable, Dict, Iterator, List, Sequence
+
+from project2 import (SAMPLE_STATIONS, has_kiosk, rent_from_station,
+                      return_to_station, direction_between)
+from project2_constants import (ID, NAME, BIKES_AVAILABLE, DOCKS_AVAILABLE,
+                                STATION_ADDED, STATION_REMOVED, BIKE_RENTED,
+                                BIKE_RETURNED, STATION_UPDATED)
+
+
+class StationRegistry:
+    """A collection of stations that keeps an index from station id to
+    station, so that looking a station up does not scan every station.
+
+    The registry holds the same station lists it was given, in the order
+    they were added, so the list based functions in project2 can still be
+    used on stations(). Listeners added with add_listener are told about
+    every change made through the registry.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> len(registry)
+    3
+    >>> registry.get_station_info(7571)
+    ['Highfield Rd / Gerrard St E - SMART', 14, 5, False]
+    >>> registry.rent_bike(7090)
+    True
+    >>> registry.get_station(7090)[BIKES_AVAILABLE]
+    3
+    >>> registry.get_direction(7486, 7090)
+    'SOUTHWEST'
+    """
+
+    def __init__(self, stations: Sequence['Station'] = ()) -> None:
+        """Initialize a registry containing stations."""
+
+        self._stations: Dict[int, 'Station'] = {}
+        self._positions: Dict[int, int] = {}
+        self._next_position = 0
+        self._listeners = []
+
+        for station in stations:
+            self.add_station(station)
+
+    def __len__(self) -> int:
+        """Return the number of stations in this registry."""
+
+        return len(self._stations)
+
+    def __contains__(self, station_id: int) -> bool:
+        """Return True if and only if a station with id station_id is in
+        this registry.
+        """
+
+        return station_id in self._stations
+
+    def __iter__(self) -> Iterator['Station']:
+        """Return an iterator over the stations in the order they were
+        added.
+        """
+
+        return iter(self._stations.values())
+
+    def stations(self) -> List['Station']:
+        """Return a list of the stations in this registry, in the order they
+        were added.
+
+        >>> registry = StationRegistry(SAMPLE_STATIONS)
+        >>> [station[ID] for station in registry.stations()]
+        [7090, 7486, 7571]
+        """
+
+        return list(self._stations.values())
+
+    def position(self, station_id: int) -> int:
+        """Return a number giving the order in which the station with id
+        station_id was added: stations added earlier have smaller numbers.
+        A station that replaces another keeps its number.
+
+        Precondition: station_id is in this registry.
+
+        >>> registry = StationRegistry(SAMPLE_STATIONS)
+        >>> registry.position(7090) < registry.position(7571)
+        True
+        """
+
+        return self._positions[station_id]
+
+    def add_listener(self, listener: Callable[[str, 'Station'], None]
+                     ) -> None:
+        """Add listener to the functions called with the kind of change
+        (STATION_ADDED, STATION_REMOVED, STATION_UPDATED, BIKE_RENTED or
+        BIKE_RETURNED) and the station changed whenever a station in this
+        registry changes.
+
+        >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+        >>> registry.add_listener(lambda change, station: print(change))
+        >>> registry.rent_bike(7090)
+        rented
+        True
+        """
+
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, 'Station'], None]
+                        ) -> None:
+        """Stop calling listener when a station in this registry changes.
+
+        Precondition: listener was added with add_listener.
+        """
+
+        self._listeners.remove(listener)
+
+    def add_station(self, station: 'Station') -> None:
+        """Add station to this registry. If a station with the same id is
+        already in this registry, it is replaced by station.
+
+        >>> registry = StationRegistry()
+        >>> registry.add_station(SAMPLE_STATIONS[0])
+        >>> 7090 in registry
+        True
+        """
+
+        station_id = station[ID]
+
+        if station_id in self._stations:
+            self._notify(STATION_REMOVED, self._stations[station_id])
+        else:
+            self._positions[station_id] = self._next_position
+            self._next_position += 1
+
+        self._stations[station_id] = station
+        self._notify(STATION_ADDED, station)
+
+    def remove_station(self, station_id: int) -> 'Station':
+        """Remove and return the station with id station_id. If there is
+        no such station, return the empty list.
+
+        >>> registry = StationRegistry(SAMPLE_STATIONS)
+        >>> registry.remove_station(7486)[NAME]
+        'Gerrard St E / Ted Reeve Dr'
+        >>> registry.remove_station(7486)
+        []
+        """
+
+        stn = self._stations.pop(station_id, [])
+
+        if stn:
+            del self._positions[station_id]
+            self._notify(STATION_REMOVED, stn)
+
+        return stn
+
+    def update_station(self, station_id: int,
+                       changes: Dict[int, Any]) -> None:
+        """Set the value at each index in changes of the station with id
+        station_id to the value changes gives for it.
+
+        Precondition: station_id is in this registry and ID is not in
+        changes.
+
+        >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+        >>> registry.update_station(7090, {BIKES_AVAILABLE: 0})
+        >>> registry.get_station_info(7090)
+        ['Danforth Ave / Lamb Ave', 0, 10, True]
+        """
+
+        stn = self._stations[station_id]
+
+        for index, value in changes.items():
+            stn[index] = value
+
+        self._notify(STATION_UPDATED, stn)
+
+    def get_station(self, station_id: int) -> 'Station':
+        """Return the station with id station_id. If there is no such
+        station, return the empty list.
+
+        >>> registry = StationRegistry(SAMPLE_STATIONS)
+        >>> registry.get_station(7486) == SAMPLE_STATIONS[1]
+        True
+        >>> registry.get_station(1)
+        []
+        """
+
+        return self._stations.get(station_id, [])
+
+    def get_station_info(self, station_id: int) -> list:
+        """Return a list containing the name, number of bikes available,
+        number of docks available and whether or not the station has a
+        kiosk for the station with id station_id, like get_station_info in
+        project2. If there is no such station, return an empty list.
+
+        >>> registry = StationRegistry(SAMPLE_STATIONS)
+        >>> registry.get_station_info(7090)
+        ['Danforth Ave / Lamb Ave', 4, 10, True]
+        >>> registry.get_station_info(1)
+        []
+        """
+
+        stn = self.get_station(station_id)
+
+        if not stn:
+            return []
+
+        return [stn[NAME], stn[BIKES_AVAILABLE], stn[DOCKS_AVAILABLE],
+                has_kiosk(stn)]
+
+    def get_direction(self, start_id: int, end_id: int) -> str:
+        """Return the direction to travel to get from station start_id to
+        station end_id.
+
+        Preconditions: start_id and end_id are in this registry.
+
+        >>> registry = StationRegistry(SAMPLE_STATIONS)
+        >>> registry.get_direction(7090, 7486)
+        'NORTHEAST'
+        """
+
+        return direction_between(self._stations[start_id],
+                                 self._stations[end_id])
+
+    def rent_bike(self, station_id: int) -> bool:
+        """Rent a single bike from the station with id station_id. Return
+        True if and only if the rental was successful. Return False if there
+        is no such station.
+
+        >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+        >>> registry.rent_bike(7486)
+        False
+        >>> registry.rent_bike(1)
+        False
+        """
+
+        stn = self.get_station(station_id)
+
+        if stn and rent_from_station(stn):
+            self._notify(BIKE_RENTED, stn)
+            return True
+
+        return False
+
+    def return_bike(self, station_id: int) -> bool:
+        """Return a single bike to the station with id station_id. Return
+        True if and only if the return was successful. Return False if there
+        is no such station.
+
+        >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+        >>> registry.return_bike(7090)
+        True
+        >>> registry.get_station(7090)[DOCKS_AVAILABLE]
+        9
+        """
+
+        stn = self.get_station(station_id)
+
+        if stn and return_to_station(stn):
+            self._notify(BIKE_RETURNED, stn)
+            return True
+
+        return False
+
+    def _notify(self, change: str, station: 'Station') -> None:
+        """Call each listener with change and station."""
+
+        for listener in self._listeners:
+            listener(change, station)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,162 @@
+"""Replaying logs of bike rentals and returns for project2"""
+#author Muntaqa Mahmood
+
+import copy
+import io
+import time
+from itertools import islice
+from typing import Callable, Dict, List, Optional, TextIO
+
+from project2 import SAMPLE_STATIONS
+from project2_constants import (BIKES_AVAILABLE, RENT_EVENT, RETURN_EVENT,
+                                EVENT_STATION_ID, EVENT_KIND)
+from project2_registry import StationRegistry
+
+# The number of events read from an event file at a time.
+REPLAY_BATCH_SIZE = 10000
+
+# The positions of the counts kept for each station by ReplayStats.
+RENTS = 0
+FAILED_RENTS = 1
+RETURNS = 2
+FAILED_RETURNS = 3
+
+
+class ReplayStats:
+    """Counts of the events replayed so far: for each station, the number of
+    successful and failed rentals and returns, plus the number of events
+    for stations that do not exist, of an unknown kind or on lines that
+    could not be read.
+    """
+
+    def __init__(self) -> None:
+        """Initialize counts for a replay that has not started."""
+
+        self.events = 0
+        self.unknown_stations = 0
+        self.unknown_kinds = 0
+        self.malformed = 0
+        self.by_station: Dict[int, List[int]] = {}
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    def counts(self, station_id: int) -> List[int]:
+        """Return the [rents, failed rents, returns, failed returns] counts
+        for the station with id station_id.
+        """
+
+        return self.by_station.get(station_id, [0, 0, 0, 0])
+
+    def total(self, index: int) -> int:
+        """Return the total over all stations of the count at index, one of
+        RENTS, FAILED_RENTS, RETURNS or FAILED_RETURNS.
+        """
+
+        return sum(counts[index] for counts in self.by_station.values())
+
+    def events_per_second(self) -> float:
+        """Return the number of events replayed per second so far."""
+
+        elapsed = time.perf_counter() - self.started
+
+        return self.events / elapsed if elapsed > 0 else 0.0
+
+
+def replay_events(event_file: TextIO, registry: 'StationRegistry',
+                  checkpoint_every: int = 0,
+                  on_checkpoint: Optional[Callable[[ReplayStats], None]]
+                  = None,
+                  batch_size: int = REPLAY_BATCH_SIZE) -> ReplayStats:
+    """Apply each event in the open CSV file event_file to the stations in
+    registry, in order, and return counts of what happened. After the
+    header, each line of event_file holds a station id and RENT_EVENT or
+    RETURN_EVENT; any further values on a line are ignored. Blank lines are
+    skipped, and lines without a whole number id and a kind are counted as
+    malformed.
+
+    Events are read batch_size at a time. If checkpoint_every is more than
+    0, on_checkpoint is called with the counts so far after every
+    checkpoint_every events.
+
+    The result is the same as calling rent_bike or return_bike for each
+    event in turn.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> events = io.StringIO('station_id,event\\n7090,rent\\n7486,rent\\n'
+    ...                      '7090,return\\n1,rent\\n\\n7090\\nx,rent\\n')
+    >>> stats = replay_events(events, registry, 2,
+    ...                       lambda stats: print(stats.events))
+    2
+    4
+    6
+    >>> stats.counts(7090), stats.counts(7486), stats.unknown_stations
+    ([1, 0, 1, 0], [0, 1, 0, 0], 1)
+    >>> stats.malformed
+    2
+    >>> registry.get_station(7090)[BIKES_AVAILABLE]
+    4
+    """
+
+    stats = ReplayStats()
+    event_file.readline()  # read and discard header
+
+    while True:
+        lines = list(islice(event_file, batch_size))
+        if not lines:
+            break
+
+        _replay_batch(lines, registry, stats, checkpoint_every,
+                      on_checkpoint)
+
+    stats.elapsed = time.perf_counter() - stats.started
+
+    return stats
+
+
+def _replay_batch(lines: List[str], registry: 'StationRegistry',
+                  stats: ReplayStats, checkpoint_every: int,
+                  on_checkpoint: Optional[Callable[[ReplayStats], None]]
+                  ) -> None:
+    """Apply the event on each of lines to registry, updating stats."""
+
+    by_station = stats.by_station
+    get_station = registry.get_station
+    actions = {RENT_EVENT: (registry.rent_bike, RENTS, FAILED_RENTS),
+               RETURN_EVENT: (registry.return_bike, RETURNS, FAILED_RETURNS)}
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        stats.events += 1
+        values = line.split(',')
+        try:
+            station_id = int(values[EVENT_STATION_ID])
+            kind = values[EVENT_KIND].strip().lower()
+        except (IndexError, ValueError):
+            station_id = kind = None
+        action = actions.get(kind)
+
+        if station_id is None:
+            stats.malformed += 1
+        elif action is None:
+            stats.unknown_kinds += 1
+        elif not get_station(station_id):
+            stats.unknown_stations += 1
+        else:
+            apply, succeeded, failed = action
+            counts = by_station.get(station_id)
+            if counts is None:
+                counts = by_station[station_id] = [0, 0, 0, 0]
+            counts[succeeded if apply(station_id) else failed] += 1
+
+        if (on_checkpoint is not None and checkpoint_every > 0
+                and stats.events % checkpoint_every == 0):
+            stats.elapsed = time.perf_counter() - stats.started
+            on_checkpoint(stats)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
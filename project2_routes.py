@@ -0,0 +1,247 @@
+"""Planning rebalancing truck routes for project2"""
+#author Muntaqa Mahmood
+
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from project2 import SAMPLE_STATIONS, get_distance, plan_balance
+from project2_constants import ID, LATITUDE, LONGITUDE
+from project2_spatial import StationIndex
+
+# The number of seconds spent improving routes by default.
+DEFAULT_TIME_BUDGET = 1.0
+
+# A change in route length smaller than this, in km, is not an improvement.
+MIN_IMPROVEMENT = 1e-9
+
+# The most stops reversed at once when shortening a route.
+TWO_OPT_WINDOW = 50
+
+
+class Stop(NamedTuple):
+    """A visit by a truck to the station with id station_id, changing the
+    number of bikes available there by change: positive when bikes are
+    dropped off and negative when they are picked up.
+    """
+    station_id: int
+    change: int
+
+
+class Route(NamedTuple):
+    """One trip of a truck from the depot and back: the stops made in
+    order, the length of the trip in km, and the number of bikes brought
+    back to the depot.
+    """
+    stops: List[Stop]
+    distance: float
+    depot_bikes: int
+
+
+def plan_routes(stations: List['Station'], capacity: int,
+                depot: Tuple[float, float],
+                plan: Optional[Dict[int, int]] = None,
+                time_budget: float = DEFAULT_TIME_BUDGET) -> List[Route]:
+    """Return routes for a truck carrying at most capacity bikes, starting
+    each trip empty at the location depot, that carry out plan on
+    stations. plan maps station ids to changes in bikes available as
+    returned by plan_balance, and is plan_balance(stations) if it is None.
+
+    Routes are built by always driving to the nearest station where the
+    truck can do something: pick up bikes while it has room, or drop them
+    off while it has some. A station may be visited more than once. A trip
+    ends when there is nothing left to do with the bikes on board, and any
+    bikes still on board are left at the depot. Each route is then
+    shortened by reversing parts of it (2-opt), as long as the truck never
+    carries more than capacity or fewer than 0 bikes, until no reversal
+    helps or time_budget seconds have passed.
+
+    Changes that cannot be made, because there are more bikes to drop off
+    than to pick up, are left out; see remaining_changes.
+
+    Precondition: capacity > 0, and every station id in plan is in
+    stations.
+
+    >>> routes = plan_routes(SAMPLE_STATIONS, 4, (43.671685, -79.325176))
+    >>> [list(route.stops) for route in routes]
+    [[Stop(station_id=7571, change=-4), Stop(station_id=7090, change=2), \
+Stop(station_id=7571, change=-2)]]
+    >>> routes[0].distance, routes[0].depot_bikes
+    (2.394, 4)
+    """
+
+    deadline = time.perf_counter() + time_budget
+    if plan is None:
+        plan = plan_balance(stations)
+
+    locations = {station[ID]: (station[LATITUDE], station[LONGITUDE])
+                 for station in stations if plan.get(station[ID], 0) != 0}
+    routes = []
+
+    for stops in _nearest_neighbour_routes(stations, plan, capacity, depot):
+        stops = _two_opt(stops, locations, capacity, depot, deadline)
+        points = [depot] + [locations[stop.station_id] for stop in stops]
+        points.append(depot)
+        distance = sum(_distance(points[i], points[i + 1])
+                       for i in range(len(points) - 1))
+        routes.append(Route(stops, round(distance, 3),
+                            -sum(stop.change for stop in stops)))
+
+    return routes
+
+
+def remaining_changes(plan: Dict[int, int],
+                      routes: List[Route]) -> Dict[int, int]:
+    """Return the changes in plan that routes do not make, leaving out the
+    stations whose changes are all made.
+
+    >>> remaining_changes({7090: 2, 7571: -6},
+    ...                   [Route([Stop(7571, -4), Stop(7090, 2)], 0.0, 2)])
+    {7571: -2}
+    """
+
+    remaining = dict(plan)
+    for route in routes:
+        for stop in route.stops:
+            remaining[stop.station_id] -= stop.change
+
+    return {station_id: change for station_id, change in remaining.items()
+            if change != 0}
+
+
+def _nearest_neighbour_routes(stations: List['Station'],
+                              plan: Dict[int, int], capacity: int,
+                              depot: Tuple[float, float]) -> List[List[Stop]]:
+    """Return the stops of the routes built by driving to the nearest
+    station where the truck can do something, as described in plan_routes.
+    """
+
+    remaining = {station_id: change for station_id, change in plan.items()
+                 if change != 0}
+    active = [station for station in stations if station[ID] in remaining]
+    locations = {station[ID]: (station[LATITUDE], station[LONGITUDE])
+                 for station in active}
+    index = StationIndex(active)
+    load = 0
+
+    def useful(station: 'Station') -> bool:
+        change = remaining.get(station[ID], 0)
+        return (change < 0 and load < capacity) or (change > 0 and load > 0)
+
+    routes = []
+    stops = []
+    here = depot
+
+    while True:
+        station_id = index.nearest(here[0], here[1], where=useful)
+
+        if station_id == -1:
+            if stops:
+                routes.append(stops)
+            # Any bikes on board are left at the depot. If the truck was
+            # empty, there are no bikes left to pick up.
+            if load == 0 or not any(change < 0
+                                    for change in remaining.values()):
+                return routes
+            stops, here, load = [], depot, 0
+            continue
+
+        change = remaining[station_id]
+        if change < 0:
+            change = -min(-change, capacity - load)
+        else:
+            change = min(change, load)
+
+        stops.append(Stop(station_id, change))
+        load -= change
+        remaining[station_id] -= change
+
+        here = locations[station_id]
+
+        if remaining[station_id] == 0:
+            del remaining[station_id]
+            # Searches skip finished stations, so drop them from the index
+            # once they are most of it.
+            if 2 * len(remaining) < len(active):
+                active = [station for station in active
+                          if station[ID] in remaining]
+                index = StationIndex(active)
+
+
+def _two_opt(stops: List[Stop], locations: Dict[int, Tuple[float, float]],
+             capacity: int, depot: Tuple[float, float],
+             deadline: float) -> List[Stop]:
+    """Return stops reordered by reversing parts of the route, of at most
+    TWO_OPT_WINDOW stops, to shorten it, keeping the load between 0 and
+    capacity, until no reversal helps or the time given by deadline is
+    reached.
+    """
+
+    stops = list(stops)
+    points = [depot] + [locations[stop.station_id] for stop in stops]
+    points.append(depot)
+    # The length of the leg from each point to the next.
+    legs = [_distance(points[i], points[i + 1])
+            for i in range(len(points) - 1)]
+    loads = [0]
+    for stop in stops:
+        loads.append(loads[-1] - stop.change)
+
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+
+        for first in range(1, len(points) - 2):
+            if time.perf_counter() >= deadline:
+                break
+
+            for last in range(first + 1,
+                              min(first + TWO_OPT_WINDOW, len(points) - 1)):
+                before = points[first - 1]
+                after = points[last + 1]
+                saving = (legs[first - 1] + legs[last]
+                          - _distance(before, points[last])
+                          - _distance(points[first], after))
+                if saving <= MIN_IMPROVEMENT:
+                    continue
+                if not _can_reverse(stops, loads, first, last, capacity):
+                    continue
+
+                stops[first - 1:last] = stops[first - 1:last][::-1]
+                points[first:last + 1] = points[first:last + 1][::-1]
+                legs[first:last] = legs[first:last][::-1]
+                legs[first - 1] = _distance(before, points[first])
+                legs[last] = _distance(points[last], after)
+                for position in range(first, last + 1):
+                    loads[position] = (loads[position - 1]
+                                       - stops[position - 1].change)
+                improved = True
+
+    return stops
+
+
+def _can_reverse(stops: List[Stop], loads: List[int], first: int, last: int,
+                 capacity: int) -> bool:
+    """Return True if and only if the truck's load stays between 0 and
+    capacity when the stops at route positions first to last (counting the
+    depot as position 0) are made in reverse order, where loads gives the
+    load after each position.
+    """
+
+    load = loads[first - 1]
+    for position in range(last, first - 1, -1):
+        load -= stops[position - 1].change
+        if not 0 <= load <= capacity:
+            return False
+
+    return True
+
+
+def _distance(start: Tuple[float, float], end: Tuple[float, float]) -> float:
+    """Return the distance in km between the locations start and end."""
+
+    return get_distance(start[0], start[1], end[0], end[1])
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
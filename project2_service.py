@@ -0,0 +1,362 @@
+"""A batching asyncio query service for project2 stations"""
+#author Muntaqa Mahmood
+
+import argparse
+import asyncio
+import copy
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from project2 import SAMPLE_STATIONS
+from project2_cache import NearestStationCache
+from project2_loader import load_stations
+from project2_registry import StationRegistry
+
+# How long, in seconds, requests are collected before a batch is run.
+DEFAULT_BATCH_WINDOW = 0.002
+
+# The most requests run in one batch.
+DEFAULT_MAX_BATCH = 1024
+
+# The operations a request can ask for, and whether each changes stations.
+OPERATIONS = {'nearest': False, 'info': False, 'rent': True, 'return': True,
+              'metrics': False}
+
+
+class StationService:
+    """Answers requests about the stations in a StationRegistry, collecting
+    the requests that arrive close together into batches.
+
+    A request is a dict with an 'op' and its arguments, and an optional
+    'id' that is copied into the response:
+
+        - {'op': 'nearest', 'lat': ..., 'lon': ..., 'with_kiosk': ...,
+          'with_bikes': ..., 'with_docks': ...} (the filters are optional,
+          and must be true or false)
+        - {'op': 'info', 'station_id': ...}
+        - {'op': 'rent', 'station_id': ...}
+        - {'op': 'return', 'station_id': ...}
+        - {'op': 'metrics'}
+
+    The response is {'id': ..., 'result': ...}, or {'id': ..., 'error': ...}
+    if the request could not be answered. Requests in a batch are answered
+    in the order they arrived, so each one sees the rents and returns
+    before it. Nearest station queries go through a NearestStationCache,
+    and a query repeated within a batch with no rent or return in between
+    is only answered once.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> service = StationService(registry)
+    >>> async def ask(requests):
+    ...     async with service:
+    ...         return await asyncio.gather(*map(service.submit, requests))
+    >>> responses = asyncio.run(ask([
+    ...     {'id': 1, 'op': 'nearest', 'lat': 43.671134, 'lon': -79.325164},
+    ...     {'id': 2, 'op': 'rent', 'station_id': 7090},
+    ...     {'id': 3, 'op': 'info', 'station_id': 7090},
+    ...     {'id': 4, 'op': 'fly'}]))
+    >>> for response in responses:
+    ...     print(response)
+    {'id': 1, 'result': 7571}
+    {'id': 2, 'result': True}
+    {'id': 3, 'result': ['Danforth Ave / Lamb Ave', 3, 11, True]}
+    {'id': 4, 'error': "unknown op 'fly'"}
+    >>> metrics = service.metrics()
+    >>> metrics['requests'], metrics['batches'], metrics['max_batch_size']
+    (4, 1, 4)
+    """
+
+    def __init__(self, registry: 'StationRegistry',
+                 batch_window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch: int = DEFAULT_MAX_BATCH) -> None:
+        """Initialize a stopped service answering requests about the
+        stations in registry, waiting batch_window seconds to collect up to
+        max_batch requests into each batch.
+        """
+
+        self.registry = registry
+        self.cache = NearestStationCache(registry)
+        self._batch_window = batch_window
+        self._max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._requests = 0
+        self._batches = 0
+        self._max_batch_size = 0
+        self._max_queue_depth = 0
+
+    async def __aenter__(self) -> 'StationService':
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def start(self) -> None:
+        """Start running batches of requests in the running event loop."""
+
+        if self._batcher is None:
+            self._queue = asyncio.Queue()
+            self._batcher = asyncio.get_running_loop().create_task(
+                self._run_batches())
+
+    async def stop(self) -> None:
+        """Finish the requests already submitted, then stop running
+        batches.
+        """
+
+        if self._batcher is None:
+            return
+
+        await self._queue.join()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+
+    def enqueue(self, request: Dict[str, Any]) -> 'asyncio.Future':
+        """Add request to the next batch and return a future for its
+        response. Requests enqueued one after another are answered in that
+        order.
+
+        Precondition: the service has been started.
+        """
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((request, future))
+        self._max_queue_depth = max(self._max_queue_depth,
+                                    self._queue.qsize())
+
+        return future
+
+    async def submit(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the response to request once its batch has run. A request
+        that cannot be answered gets an error response, and the requests
+        after it are still answered.
+
+        >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+        >>> async def ask_each(requests):
+        ...     async with StationService(registry) as service:
+        ...         return [await service.submit(request)
+        ...                 for request in requests]
+        >>> responses = asyncio.run(ask_each([
+        ...     {'op': 'nearest', 'lat': 10 ** 400, 'lon': 0},
+        ...     {'op': 'nearest', 'lat': 0, 'lon': 0, 'with_kiosk': 'false'},
+        ...     {'op': 'rent', 'station_id': 7571}]))
+        >>> responses[0]['error']
+        'bad request: int too large to convert to float'
+        >>> responses[1]['error']
+        'with_kiosk must be true or false'
+        >>> responses[2]['result']
+        True
+        """
+
+        return await self.enqueue(request)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return the numbers of requests and batches run so far, the mean
+        and largest batch sizes, the number of requests waiting now and the
+        most ever waiting, and the statistics of the nearest station cache.
+        """
+
+        return {'requests': self._requests, 'batches': self._batches,
+                'mean_batch_size': (self._requests / self._batches
+                                    if self._batches else 0.0),
+                'max_batch_size': self._max_batch_size,
+                'queue_depth': self._queue.qsize() if self._queue else 0,
+                'max_queue_depth': self._max_queue_depth,
+                'cache': self.cache.stats()}
+
+    def run_batch(self, requests: List[Dict[str, Any]]
+                  ) -> List[Dict[str, Any]]:
+        """Return the responses to requests, answered in order."""
+
+        # Answers to the queries since the last change, by query.
+        answers: Dict[Tuple, Any] = {}
+        responses = []
+
+        for request in requests:
+            response = {'id': request.get('id')} if isinstance(request,
+                                                                dict) else {}
+            try:
+                op = request['op']
+                if op not in OPERATIONS:
+                    raise ValueError('unknown op {!r}'.format(op))
+                key = self._key(request)
+                if key in answers:
+                    result = answers[key]
+                else:
+                    result = self._answer(request)
+                    if OPERATIONS[op]:
+                        answers.clear()
+                    elif op != 'metrics':
+                        answers[key] = result
+                response['result'] = result
+            except Exception as error:
+                response['error'] = (str(error) if isinstance(error,
+                                                              ValueError)
+                                     else 'bad request: {}'.format(error))
+            responses.append(response)
+
+        return responses
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Answer each JSON request read from reader, one per line, by
+        writing its JSON response to writer on a line of its own. Responses
+        are written in the order the requests were read, as their batches
+        finish, so a client may send many requests without waiting.
+        """
+
+        # The futures for the responses not yet written, in request order.
+        # Reading waits while it is full, so a client sending requests
+        # faster than they are answered does not use ever more memory.
+        pending: asyncio.Queue = asyncio.Queue(self._max_batch)
+
+        async def respond() -> None:
+            while True:
+                future = await pending.get()
+                if future is None:
+                    return
+                try:
+                    response = await future
+                except Exception as error:
+                    response = {'error': 'internal error: {}'.format(error)}
+                # Keep taking futures after the client goes away, so that
+                # reading never waits on a full queue.
+                if not writer.is_closing():
+                    try:
+                        writer.write(json.dumps(response).encode() + b'\n')
+                        await writer.drain()
+                    except ConnectionError:
+                        writer.close()
+
+        responding = asyncio.ensure_future(respond())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = {'op': None}
+                await pending.put(self.enqueue(request))
+            await pending.put(None)
+            await responding
+        finally:
+            responding.cancel()
+            writer.close()
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 0,
+                    path: Optional[str] = None) -> 'asyncio.AbstractServer':
+        """Start the service, and return a server listening for connections
+        on the Unix socket at path, or on host and port if path is None.
+        """
+
+        self.start()
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection,
+                                                   path)
+
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def _run_batches(self) -> None:
+        """Run batches of the requests in the queue, forever."""
+
+        while True:
+            batch = [await self._queue.get()]
+            if self._batch_window > 0:
+                await asyncio.sleep(self._batch_window)
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                responses = self.run_batch([request for request, _ in batch])
+                for (_, future), response in zip(batch, responses):
+                    if not future.done():
+                        future.set_result(response)
+            except Exception as error:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(error)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            self._requests += len(batch)
+            self._batches += 1
+            self._max_batch_size = max(self._max_batch_size, len(batch))
+
+    def _answer(self, request: Dict[str, Any]) -> Any:
+        """Return the result of request."""
+
+        op = request['op']
+        if op == 'nearest':
+            return self.cache.nearest(float(request['lat']),
+                                      float(request['lon']),
+                                      self._flag(request, 'with_kiosk'),
+                                      self._flag(request, 'with_bikes'),
+                                      self._flag(request, 'with_docks'))
+        if op == 'info':
+            return self.registry.get_station_info(request['station_id'])
+        if op == 'rent':
+            return self.registry.rent_bike(request['station_id'])
+        if op == 'return':
+            return self.registry.return_bike(request['station_id'])
+
+        return self.metrics()
+
+    @staticmethod
+    def _flag(request: Dict[str, Any], name: str) -> bool:
+        """Return the filter called name in request, False if it is not
+        given. Raise ValueError if it is not a JSON boolean.
+        """
+
+        value = request.get(name, False)
+        if not isinstance(value, bool):
+            raise ValueError('{} must be true or false'.format(name))
+
+        return value
+
+    @staticmethod
+    def _key(request: Dict[str, Any]) -> Tuple:
+        """Return what identifies the answer to request."""
+
+        return tuple(sorted((name, json.dumps(value))
+                            for name, value in request.items()
+                            if name != 'id'))
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Serve the stations in the CSV file named by the command line
+    arguments argv until interrupted.
+    """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('stations', help='station CSV file')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help='Unix socket path to listen on')
+    parser.add_argument('--batch-window', type=float,
+                        default=DEFAULT_BATCH_WINDOW)
+    args = parser.parse_args(argv)
+
+    with open(args.stations) as csv_file:
+        registry = StationRegistry(load_stations(csv_file))
+
+    async def run() -> None:
+        service = StationService(registry, args.batch_window)
+        server = await service.serve(args.host, args.port, args.unix)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    main()
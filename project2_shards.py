@@ -0,0 +1,345 @@
+"""Sharding stations across worker processes by location for project2"""
+#author Muntaqa Mahmood
+
+import math
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
+
+from project2 import SAMPLE_STATIONS, get_distance
+from project2_attributes import tile_of
+from project2_constants import (ID, LATITUDE, LONGITUDE, CAPACITY,
+                                BIKES_AVAILABLE)
+from project2_registry import StationRegistry
+from project2_spatial import ROUNDING_SLACK, StationIndex
+
+# The size in degrees of latitude and longitude of a shard tile by default
+# (about 5 km north to south).
+DEFAULT_SHARD_TILE_SIZE = 0.05
+
+# The distance from a location to the nearest corner or edge of a tile is
+# worked out along lines of latitude and longitude, which can overestimate
+# the true distance very slightly; it is scaled down by this much to be
+# safe.
+TILE_DISTANCE_SLACK = 1e-3
+
+
+class ShardedStations:
+    """Stations split into tiles by location, with the tiles shared out
+    between worker processes that each own the stations in their tiles.
+
+    Renting, returning and looking up a station is done by the process
+    that owns it. The nearest station is first asked of the process owning
+    the tiles closest to the query location, then of any other process
+    owning a tile that could hold a nearer station. Totals are added up
+    over every process. Answers are the same as the functions in project2
+    give for the stations in the order they were given.
+
+    >>> with ShardedStations(SAMPLE_STATIONS, tile_size=0.01,
+    ...                      workers=2) as shards:
+    ...     print(shards.rent_bike(7090), shards.get_station_info(7090))
+    ...     print(shards.get_nearest_station(43.671134, -79.325164, False))
+    ...     print(shards.get_total(BIKES_AVAILABLE),
+    ...           shards.calculate_target_percentage())
+    ...     print(shards.get_station_with_max_bikes())
+    True ['Danforth Ave / Lamb Ave', 3, 11, True]
+    7571
+    22 0.39
+    7571
+    """
+
+    def __init__(self, stations: List['Station'],
+                 tile_size: float = DEFAULT_SHARD_TILE_SIZE,
+                 workers: Optional[int] = None) -> None:
+        """Initialize shards of stations, split into tile_size by tile_size
+        degree tiles owned by workers processes (or one per core if workers
+        is None, and never more than there are tiles).
+        """
+
+        tiles = sorted({tile_of(station[LATITUDE], station[LONGITUDE],
+                                tile_size) for station in stations})
+        workers = max(1, min(workers or multiprocessing.cpu_count(),
+                             len(tiles)))
+        owners = {tile: number % workers for number, tile in enumerate(tiles)}
+
+        self._tile_size = tile_size
+        # The tiles owned by each shard.
+        self._tiles: List[List[Tuple[int, int]]] = [[] for _ in range(workers)]
+        for tile, shard in owners.items():
+            self._tiles[shard].append(tile)
+
+        # The shard owning each station, and the (position, station) pairs
+        # each shard is given.
+        self._owners: Dict[int, int] = {}
+        entries: List[list] = [[] for _ in range(workers)]
+        for position, station in enumerate(stations):
+            shard = owners[tile_of(station[LATITUDE], station[LONGITUDE],
+                                   tile_size)]
+            self._owners[station[ID]] = shard
+            entries[shard].append((position, list(station)))
+
+        self._connections = []
+        self._processes = []
+        for shard_entries in entries:
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve_shard,
+                                              args=(child, shard_entries),
+                                              daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self) -> 'ShardedStations':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of stations in all shards."""
+
+        return len(self._owners)
+
+    def shard_count(self) -> int:
+        """Return the number of shards."""
+
+        return len(self._connections)
+
+    def close(self) -> None:
+        """Stop the worker processes."""
+
+        for connection in self._connections:
+            connection.send(('close', ()))
+            connection.close()
+        for process in self._processes:
+            process.join()
+
+        self._connections = []
+        self._processes = []
+
+    def rent_bike(self, station_id: int) -> bool:
+        """Rent a bike from the station with id station_id, like rent_bike
+        in project2. Return False if there is no such station.
+        """
+
+        return self._ask_owner(station_id, 'rent_bike', False)
+
+    def return_bike(self, station_id: int) -> bool:
+        """Return a bike to the station with id station_id, like return_bike
+        in project2. Return False if there is no such station.
+        """
+
+        return self._ask_owner(station_id, 'return_bike', False)
+
+    def get_station(self, station_id: int) -> 'Station':
+        """Return a copy of the station with id station_id, or an empty list
+        if there is no such station.
+        """
+
+        return self._ask_owner(station_id, 'get_station', [])
+
+    def get_station_info(self, station_id: int) -> list:
+        """Return the name, bikes available, docks available and kiosk flag
+        of the station with id station_id, like get_station_info in
+        project2, or an empty list if there is no such station.
+        """
+
+        return self._ask_owner(station_id, 'get_station_info', [])
+
+    def get_nearest_station(self, lat: float, lon: float, with_kiosk: bool,
+                            with_bikes: bool = False,
+                            with_docks: bool = False) -> int:
+        """Return the id of the station nearest to the location given by lat
+        and lon, with the filters of StationIndex.nearest, breaking ties in
+        favour of the station given first. Return -1 if no station matches.
+        """
+
+        bounds = [min((self._tile_distance(lat, lon, tile)
+                       for tile in tiles), default=math.inf)
+                  for tiles in self._tiles]
+        order = sorted(range(len(bounds)), key=bounds.__getitem__)
+        filters = (with_kiosk, with_bikes, with_docks)
+
+        best = self._ask(order[0], 'nearest', (lat, lon) + filters +
+                         (math.inf,))
+
+        # Ask every other shard that could hold a station as near as the
+        # best found so far, all at once.
+        limit = best[0] if best else math.inf
+        others = [shard for shard in order[1:]
+                  if bounds[shard] <= limit + ROUNDING_SLACK]
+        for shard in others:
+            self._connections[shard].send(('nearest', (lat, lon) + filters +
+                                           (limit,)))
+        for shard in others:
+            found = self._receive(shard)
+            if found is not None and (best is None or found < best):
+                best = found
+
+        return best[2] if best else -1
+
+    def get_total(self, index: int) -> int:
+        """Return the sum of the column given by index over all stations,
+        like get_total in project2.
+        """
+
+        return sum(self._ask_all('get_total', (index,)))
+
+    def calculate_target_percentage(self) -> float:
+        """Return the target percentage of available bikes at each station,
+        like calculate_target_percentage in project2.
+
+        Precondition: the total capacity of the stations is not 0.
+        """
+
+        totals = self._ask_all('bikes_and_capacity', ())
+
+        return round(sum(bikes for bikes, _ in totals) /
+                     sum(capacity for _, capacity in totals), 2)
+
+    def get_station_with_max_bikes(self) -> int:
+        """Return the id of the station with the most bikes available, like
+        get_station_with_max_bikes in project2: ties go to the station given
+        first, and -1 is returned if no station has a bike.
+        """
+
+        best = max(self._ask_all('max_bikes', ()))
+
+        return best[2] if best[0] > 0 else -1
+
+    def _tile_distance(self, lat: float, lon: float,
+                       tile: Tuple[int, int]) -> float:
+        """Return a distance in km no more than the distance from the
+        location given by lat and lon to any location in tile.
+        """
+
+        row, column = tile
+        nearest_lat = min(max(lat, row * self._tile_size),
+                          (row + 1) * self._tile_size)
+        nearest_lon = min(max(lon, column * self._tile_size),
+                          (column + 1) * self._tile_size)
+        distance = get_distance(lat, lon, nearest_lat, nearest_lon)
+
+        return max(0.0, distance * (1 - TILE_DISTANCE_SLACK) - 0.001)
+
+    def _ask_owner(self, station_id: int, op: str, missing):
+        """Return the answer to op about the station with id station_id
+        from the shard owning it, or missing if no shard owns it.
+        """
+
+        shard = self._owners.get(station_id)
+        if shard is None:
+            return missing
+
+        return self._ask(shard, op, (station_id,))
+
+    def _ask_all(self, op: str, args: tuple) -> list:
+        """Return the answer to op with args from every shard."""
+
+        for connection in self._connections:
+            connection.send((op, args))
+
+        return [self._receive(shard)
+                for shard in range(len(self._connections))]
+
+    def _ask(self, shard: int, op: str, args: tuple):
+        """Return the answer to op with args from shard."""
+
+        self._connections[shard].send((op, args))
+
+        return self._receive(shard)
+
+    def _receive(self, shard: int):
+        """Return the next answer from shard, raising any error it had."""
+
+        answer = self._connections[shard].recv()
+        if isinstance(answer, Exception):
+            raise answer
+
+        return answer
+
+
+class _Shard:
+    """The stations owned by one worker process, with their positions in
+    the list of all stations.
+    """
+
+    def __init__(self, entries: List[Tuple[int, 'Station']]) -> None:
+        stations = [station for _, station in entries]
+        self._positions = {station[ID]: position
+                           for position, station in entries}
+        self._registry = StationRegistry(stations)
+        self._index = StationIndex(stations)
+
+    def rent_bike(self, station_id: int) -> bool:
+        return self._registry.rent_bike(station_id)
+
+    def return_bike(self, station_id: int) -> bool:
+        return self._registry.return_bike(station_id)
+
+    def get_station(self, station_id: int) -> 'Station':
+        return self._registry.get_station(station_id)
+
+    def get_station_info(self, station_id: int) -> list:
+        return self._registry.get_station_info(station_id)
+
+    def nearest(self, lat: float, lon: float, with_kiosk: bool,
+                with_bikes: bool, with_docks: bool,
+                limit: float) -> Optional[Tuple[float, int, int]]:
+        """Return the (distance, position, id) of the nearest station in
+        this shard passing the filters, or None if there is none within
+        limit (allowing for rounding).
+        """
+
+        station_id = self._index.nearest(lat, lon, with_kiosk, with_bikes,
+                                         with_docks)
+        if station_id == -1:
+            return None
+
+        station = self._registry.get_station(station_id)
+        distance = get_distance(lat, lon, station[LATITUDE],
+                                station[LONGITUDE])
+        if distance > limit + ROUNDING_SLACK:
+            return None
+
+        return (distance, self._positions[station_id], station_id)
+
+    def get_total(self, index: int) -> int:
+        return sum(station[index] for station in self._registry)
+
+    def bikes_and_capacity(self) -> Tuple[int, int]:
+        return (self.get_total(BIKES_AVAILABLE), self.get_total(CAPACITY))
+
+    def max_bikes(self) -> Tuple[int, int, int]:
+        """Return the (bikes, -position, id) of the station in this shard
+        with the most bikes, ties going to the first station.
+        """
+
+        return max(((station[BIKES_AVAILABLE],
+                     -self._positions[station[ID]], station[ID])
+                    for station in self._registry), default=(0, 0, -1))
+
+
+def _serve_shard(connection, entries: List[Tuple[int, 'Station']]) -> None:
+    """Answer requests from connection about the stations in entries until
+    asked to close.
+    """
+
+    shard = _Shard(entries)
+
+    while True:
+        op, args = connection.recv()
+        if op == 'close':
+            connection.close()
+            return
+
+        try:
+            answer = getattr(shard, op)(*args)
+        except Exception as error:
+            answer = error
+        connection.send(answer)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,162 @@
+"""Simulating rebalancing over many demand scenarios for project2"""
+#author Muntaqa Mahmood
+
+import random
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import (Callable, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional)
+
+from project2 import (HANDOUT_STATIONS, balance_all_bikes, rent_from_station,
+                      return_to_station)
+from project2_constants import CAPACITY, BIKES_AVAILABLE
+from project2_snapshot import StationSnapshot, dump_snapshot
+
+# The number of scenarios sent to a worker process at a time.
+SCENARIO_CHUNK_SIZE = 16
+
+# The stations every scenario starts from, set once in each worker process.
+_base_stations: List['Station'] = []
+
+
+class Scenario(NamedTuple):
+    """A synthetic day of demand: trips trips between stations chosen at
+    random by a generator seeded with seed.
+    """
+    seed: int
+    trips: int
+
+
+class ScenarioResult(NamedTuple):
+    """The outcome of one scenario: the net number of bikes moved by the
+    rebalancing policy (rented minus returned), the number of trips that
+    could not start or end where they wanted to, and the fraction of each
+    station's capacity holding bikes at the end.
+    """
+    seed: int
+    net_moves: int
+    unmet_demand: int
+    fill_ratios: array
+
+
+def simulate(stations: List['Station'], scenarios: Iterable[Scenario],
+             policy: Callable[[List['Station']], int] = balance_all_bikes,
+             workers: Optional[int] = None) -> Iterator[ScenarioResult]:
+    """Yield the result of running each of scenarios on its own copy of
+    stations followed by policy, in the same order as scenarios, as each
+    result becomes available.
+
+    Scenarios are spread over workers processes (or one per core if workers
+    is None). stations are sent to each worker once, as a binary snapshot,
+    rather than with every scenario. policy must be a function defined at
+    the top level of a module so it can be sent to the workers.
+
+    Precondition: no station has None for any of its values.
+
+    >>> scenarios = [Scenario(seed, 20) for seed in range(4)]
+    >>> results = list(simulate(HANDOUT_STATIONS, scenarios, workers=2))
+    >>> [result.seed for result in results]
+    [0, 1, 2, 3]
+    >>> results == list(run_scenarios(HANDOUT_STATIONS, scenarios))
+    True
+    """
+
+    with ProcessPoolExecutor(workers, initializer=_load_stations,
+                             initargs=(dump_snapshot(stations),)) as pool:
+        yield from pool.map(_run_scenario, scenarios, repeat(policy),
+                            chunksize=SCENARIO_CHUNK_SIZE)
+
+
+def run_scenarios(stations: List['Station'], scenarios: Iterable[Scenario],
+                  policy: Callable[[List['Station']], int] = balance_all_bikes
+                  ) -> Iterator[ScenarioResult]:
+    """Yield the result of running each of scenarios on its own copy of
+    stations followed by policy, in this process.
+
+    >>> result = next(run_scenarios(HANDOUT_STATIONS, [Scenario(7, 0)]))
+    >>> result.net_moves, result.unmet_demand
+    (0, 0)
+    >>> [round(ratio, 2) for ratio in result.fill_ratios]
+    [0.55, 0.53]
+    """
+
+    for scenario in scenarios:
+        yield run_scenario([station[:] for station in stations], scenario,
+                           policy)
+
+
+def run_scenario(stations: List['Station'], scenario: Scenario,
+                 policy: Callable[[List['Station']], int] = balance_all_bikes
+                 ) -> ScenarioResult:
+    """Return the result of making the trips in scenario on stations, then
+    rebalancing stations with policy. stations is changed.
+
+    Each trip rents a bike from a random station and returns it to another
+    random station. A trip that cannot rent a bike, or whose bike cannot be
+    returned where it was going, counts as unmet demand; in the second case
+    the bike is taken back out of the network.
+    """
+
+    rng = random.Random(scenario.seed)
+    unmet = 0
+
+    for _ in range(scenario.trips):
+        start, end = rng.choice(stations), rng.choice(stations)
+
+        if not rent_from_station(start):
+            unmet += 1
+        elif not return_to_station(end):
+            unmet += 1
+
+    net_moves = policy(stations)
+    fill_ratios = array('d', [station[BIKES_AVAILABLE] / station[CAPACITY]
+                              for station in stations])
+
+    return ScenarioResult(scenario.seed, net_moves, unmet, fill_ratios)
+
+
+def summarize(results: Iterable[ScenarioResult]) -> Dict[str, float]:
+    """Return the number of scenarios in results, their mean net moves and
+    unmet demand, and the mean fill ratio over every station in every
+    scenario.
+
+    >>> summarize(run_scenarios(HANDOUT_STATIONS, [Scenario(7, 0)]))
+    {'scenarios': 1, 'net_moves': 0.0, 'unmet_demand': 0.0, 'fill_ratio': 0.54}
+    """
+
+    count = 0
+    net_moves = unmet = fill = 0.0
+    ratios = 0
+
+    for result in results:
+        count += 1
+        net_moves += result.net_moves
+        unmet += result.unmet_demand
+        fill += sum(result.fill_ratios)
+        ratios += len(result.fill_ratios)
+
+    return {'scenarios': count,
+            'net_moves': net_moves / count if count else 0.0,
+            'unmet_demand': unmet / count if count else 0.0,
+            'fill_ratio': round(fill / ratios, 2) if ratios else 0.0}
+
+
+def _load_stations(snapshot: bytes) -> None:
+    """Set the stations scenarios start from in this worker process."""
+
+    global _base_stations
+    _base_stations = StationSnapshot(snapshot).to_list()
+
+
+def _run_scenario(scenario: Scenario,
+                  policy: Callable[[List['Station']], int]) -> ScenarioResult:
+    """Return the result of scenario on a copy of this worker's stations."""
+
+    return run_scenario([station[:] for station in _base_stations], scenario,
+                        policy)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
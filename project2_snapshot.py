@@ -0,0 +1,261 @@
+"""Binary, memory-mapped snapshots of station state for project2"""
+#author Muntaqa Mahmood
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Iterator, List, Tuple
+
+from project2 import SAMPLE_STATIONS, get_station_info, get_nearest_station
+from project2_columns import STATION_WIDTH, StationRow
+from project2_constants import (ID, NAME, LATITUDE, LONGITUDE, CAPACITY,
+                                BIKES_AVAILABLE, DOCKS_AVAILABLE, IS_RENTING,
+                                IS_RETURNING)
+
+# The first bytes of every snapshot, and the version of the layout.
+SNAPSHOT_MAGIC = b'BKSN'
+SNAPSHOT_VERSION = 2
+
+# The header: magic, version, the number of stations, and the byte order of
+# the numbers in the columns.
+_HEADER = struct.Struct('<4sIIB')
+
+# How each byte order is recorded in the header.
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+
+# The array type code of each numeric column, in the order they are stored.
+_COLUMN_TYPES = ((ID, 'i'), (LATITUDE, 'd'), (LONGITUDE, 'd'),
+                 (CAPACITY, 'i'), (BIKES_AVAILABLE, 'i'),
+                 (DOCKS_AVAILABLE, 'i'), (IS_RENTING, 'B'),
+                 (IS_RETURNING, 'B'))
+
+# Every column starts at a multiple of this many bytes.
+_ALIGNMENT = 8
+
+
+def dump_snapshot(stations: List['Station']) -> bytes:
+    """Return a binary snapshot of stations. Numbers are stored in fixed
+    width columns in this machine's byte order, which is recorded in the
+    header, followed by a table of the station names.
+
+    Precondition: no station has None for any of its values.
+
+    >>> snapshot = StationSnapshot(dump_snapshot(SAMPLE_STATIONS))
+    >>> snapshot[1] == SAMPLE_STATIONS[1]
+    True
+    """
+
+    count = len(stations)
+    parts = [_padded(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, count,
+                                  _BYTE_ORDERS[sys.byteorder]))]
+
+    for index, typecode in _COLUMN_TYPES:
+        column = array(typecode, [station[index] for station in stations])
+        parts.append(_padded(column.tobytes()))
+
+    names = [station[NAME].encode('utf-8') for station in stations]
+    offsets = array('I', [0])
+    for name in names:
+        offsets.append(offsets[-1] + len(name))
+
+    parts.append(_padded(offsets.tobytes()))
+    parts.append(b''.join(names))
+
+    return b''.join(parts)
+
+
+def save_snapshot(stations: List['Station'], path: str) -> None:
+    """Write a binary snapshot of stations to the file at path.
+
+    >>> path = os.path.join(tempfile.mkdtemp(), 'stations.snap')
+    >>> save_snapshot(SAMPLE_STATIONS, path)
+    >>> with open_snapshot(path) as snapshot:
+    ...     get_station_info(7571, snapshot)
+    ['Highfield Rd / Gerrard St E - SMART', 14, 5, False]
+    """
+
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(dump_snapshot(stations))
+
+
+def open_snapshot(path: str) -> 'StationSnapshot':
+    """Return the snapshot in the file at path, mapped into memory read-only
+    so that processes opening the same file share its pages.
+    """
+
+    with open(path, 'rb') as snapshot_file:
+        mapped = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        return StationSnapshot(mapped)
+    except ValueError:
+        mapped.close()
+        raise
+
+
+class StationSnapshot:
+    """Stations read straight from a binary snapshot in a buffer, such as
+    bytes or a memory-mapped file, without copying them.
+
+    Like a StationTable, indexing a StationSnapshot gives a StationRow, so
+    the list based functions in project2 that only read stations can be
+    used on it. Snapshots opened with open_snapshot are read-only.
+
+    >>> snapshot = StationSnapshot(dump_snapshot(SAMPLE_STATIONS))
+    >>> len(snapshot)
+    3
+    >>> get_nearest_station(43.674312, -79.299221, True, snapshot)
+    7486
+    >>> [station[ID] for station in snapshot]
+    [7090, 7486, 7571]
+    """
+
+    def __init__(self, buffer) -> None:
+        """Initialize a view of the snapshot in buffer. Raise ValueError if
+        it is not a snapshot of this version, or if its numbers are in a
+        different byte order from this machine's.
+
+        >>> data = bytearray(dump_snapshot(SAMPLE_STATIONS))
+        >>> data[_HEADER.size - 1] ^= 1
+        >>> StationSnapshot(data) # doctest: +ELLIPSIS
+        Traceback (most recent call last):
+        ...
+        ValueError: snapshot numbers are not ...-endian like this machine's
+        """
+
+        magic, version, count, byte_order = _HEADER.unpack_from(buffer)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+            raise ValueError('not a version {} station snapshot'.format(
+                SNAPSHOT_VERSION))
+        if byte_order != _BYTE_ORDERS[sys.byteorder]:
+            raise ValueError('snapshot numbers are not {}-endian like this '
+                             "machine's".format(sys.byteorder))
+
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+
+        self._count = count
+        self._columns = [None] * STATION_WIDTH
+        start = _aligned(_HEADER.size)
+
+        for index, typecode in _COLUMN_TYPES:
+            start, self._columns[index] = self._column(start, typecode, count)
+
+        start, offsets = self._column(start, 'I', count + 1)
+        self._columns[NAME] = _Names(offsets, self._view[start:])
+
+    def __enter__(self) -> 'StationSnapshot':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of stations in this snapshot."""
+
+        return self._count
+
+    def __getitem__(self, position: int) -> 'StationRow':
+        """Return a view of the station at position in this snapshot."""
+
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError('station position out of range')
+
+        return StationRow(self, position)
+
+    def __iter__(self) -> Iterator['StationRow']:
+        """Return an iterator over views of the stations in this snapshot."""
+
+        return (StationRow(self, position) for position in range(self._count))
+
+    def column(self, index: int):
+        """Return the column holding the values at index of each station.
+
+        >>> snapshot = StationSnapshot(dump_snapshot(SAMPLE_STATIONS))
+        >>> list(snapshot.column(IS_RENTING))
+        [1, 0, 1]
+        """
+
+        return self._columns[index]
+
+    def to_list(self) -> List['Station']:
+        """Return the stations in this snapshot as a list of station lists.
+
+        >>> stations = StationSnapshot(dump_snapshot(SAMPLE_STATIONS))
+        >>> stations.to_list() == SAMPLE_STATIONS
+        True
+        """
+
+        return [list(row) for row in self]
+
+    def close(self) -> None:
+        """Release this snapshot's buffer. The snapshot cannot be used
+        afterwards.
+        """
+
+        self._columns[NAME].release()
+        for index, _ in _COLUMN_TYPES:
+            self._columns[index].release()
+        self._view.release()
+
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def _column(self, start: int, typecode: str,
+                count: int) -> Tuple[int, memoryview]:
+        """Return where the next column starts, and a view of count values
+        of type typecode starting at byte start.
+        """
+
+        size = count * array(typecode).itemsize
+        column = self._view[start:start + size].cast(typecode)
+
+        return _aligned(start + size), column
+
+
+class _Names:
+    """The station names in a snapshot, read from a table of offsets into
+    the UTF-8 encoded names.
+    """
+
+    def __init__(self, offsets: memoryview, encoded: memoryview) -> None:
+        self._offsets = offsets
+        self._encoded = encoded
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        start, end = self._offsets[position], self._offsets[position + 1]
+
+        return str(self._encoded[start:end], 'utf-8')
+
+    def release(self) -> None:
+        """Release the views of the snapshot held by these names."""
+
+        self._offsets.release()
+        self._encoded.release()
+
+
+def _aligned(size: int) -> int:
+    """Return size rounded up to a multiple of _ALIGNMENT."""
+
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def _padded(data: bytes) -> bytes:
+    """Return data with zero bytes added to make its length a multiple of
+    _ALIGNMENT.
+    """
+
+    return data + bytes(_aligned(len(data)) - len(data))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
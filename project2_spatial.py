@@ -0,0 +1,292 @@
+"""Spatial index for nearest station queries in project2"""
+#author Muntaqa Mahmood
+
+import heapq
+import math
+from typing import Callable, List, Optional
+
+from project2 import SAMPLE_STATIONS, FAKE_STATIONS, get_distance
+from project2_attributes import KIOSK, StationAttributes
+from project2_constants import (ID, LATITUDE, LONGITUDE, BIKES_AVAILABLE,
+                                DOCKS_AVAILABLE, EARTH_RADIUS)
+
+# The most stations kept together in one leaf of the tree.
+LEAF_SIZE = 8
+
+# get_distance rounds to the nearest metre, so a station whose true
+# distance is up to half a metre past the best rounded distance can still
+# tie with it. Subtrees are only skipped when they are further than this.
+ROUNDING_SLACK = 0.0005 + 1e-9
+
+
+def to_unit_vector(lat: float, lon: float) -> tuple:
+    """Return the point on the unit sphere at latitude lat and longitude lon
+    as an (x, y, z) tuple.
+
+    >>> to_unit_vector(0, 0)
+    (1.0, 0.0, 0.0)
+    """
+
+    lat, lon = math.radians(lat), math.radians(lon)
+    cos_lat = math.cos(lat)
+
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord: float) -> float:
+    """Return the distance in kilometres along the surface of the earth
+    between two points that are chord apart on the unit sphere.
+
+    >>> abs(chord_to_km(2.0) - math.pi * EARTH_RADIUS) < 0.001
+    True
+    """
+
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, chord / 2))
+
+
+class StationIndex:
+    """A k-d tree over the locations of stations, built once from a list of
+    stations, that answers nearest, k-nearest and within-radius queries
+    without computing the distance to every station.
+
+    Distances are computed with get_distance, and ties are broken in favour
+    of the station that appears first in stations, so nearest gives the
+    same answer as get_nearest_station. Availability filters look at the
+    stations as they are when queried, but which stations have a kiosk is
+    taken from their StationAttributes when the index is built, so the
+    index must be rebuilt if stations are added, removed, moved or renamed.
+
+    >>> index = StationIndex(SAMPLE_STATIONS)
+    >>> index.nearest(43.671134, -79.325164)
+    7571
+    >>> index.nearest(43.674312, -79.299221, with_kiosk=True)
+    7486
+    >>> index.k_nearest(43.671134, -79.325164, 2)
+    [7571, 7090]
+    >>> index.within_radius(43.671134, -79.325164, 1.5)
+    [7571, 7090]
+    """
+
+    def __init__(self, stations: List['Station'],
+                 attributes: Optional['StationAttributes'] = None) -> None:
+        """Initialize an index over the locations of stations, with the
+        kiosk flag of attributes, the StationAttributes of stations (worked
+        out here if it is None).
+
+        >>> attributes = StationAttributes(SAMPLE_STATIONS)
+        >>> index = StationIndex(SAMPLE_STATIONS, attributes)
+        >>> index.nearest(43.674312, -79.299221, with_kiosk=True)
+        7486
+        """
+
+        entries = []
+        if attributes is None:
+            attributes = StationAttributes(stations)
+        # A 1 for each station with a kiosk, by position.
+        self._kiosk = attributes.flag(KIOSK)
+        for position, station in enumerate(stations):
+            x, y, z = to_unit_vector(station[LATITUDE], station[LONGITUDE])
+            entries.append((x, y, z, position, station))
+
+        self._size = len(entries)
+        self._root = _build(entries)
+
+    def __len__(self) -> int:
+        """Return the number of stations in this index."""
+
+        return self._size
+
+    def nearest(self, lat: float, lon: float, with_kiosk: bool = False,
+                with_bikes: bool = False, with_docks: bool = False,
+                where: Optional[Callable[['Station'], bool]] = None) -> int:
+        """Return the id of the station nearest to the location given by lat
+        and lon. If with_kiosk is True, only consider stations with a
+        kiosk; if with_bikes is True, only stations with a bike available;
+        if with_docks is True, only stations with a dock available; and if
+        where is given, only stations for which it returns True.
+
+        In the case of a tie, return the id of the first such station in
+        the stations the index was built from. Return -1 if no station
+        matches.
+
+        >>> index = StationIndex(FAKE_STATIONS)
+        >>> index.nearest(43.0, -79.35)
+        1000
+        >>> index.nearest(43.0, -79.3, with_bikes=True)
+        1001
+        >>> index.nearest(43.0, -79.3, where=lambda station: False)
+        -1
+        """
+
+        found = self.k_nearest(lat, lon, 1, with_kiosk, with_bikes,
+                               with_docks, where)
+
+        return found[0] if found else -1
+
+    def k_nearest(self, lat: float, lon: float, k: int,
+                  with_kiosk: bool = False, with_bikes: bool = False,
+                  with_docks: bool = False,
+                  where: Optional[Callable[['Station'], bool]] = None
+                  ) -> List[int]:
+        """Return the ids of the (at most) k stations nearest to the
+        location given by lat and lon, nearest first, using the same
+        filters and tie-breaking as nearest.
+
+        >>> index = StationIndex(FAKE_STATIONS)
+        >>> index.k_nearest(43.0, -79.3, 3)
+        [1000, 1001, 1002]
+        >>> index.k_nearest(43.0, -79.3, 0)
+        []
+        """
+
+        if k <= 0:
+            return []
+
+        search = _Search(lat, lon, _make_filter(with_bikes, with_docks,
+                                                where),
+                         self._kiosk if with_kiosk else None)
+        # A max-heap of the best k (distance, position, id) found so far.
+        best = []
+
+        def accept(distance: float, position: int, station_id: int) -> None:
+            item = (-distance, -position, station_id)
+            if len(best) < k:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+            if len(best) == k:
+                search.limit = -best[0][0]
+
+        search.run(self._root, accept)
+
+        return [station_id for _, _, station_id in sorted(best, reverse=True)]
+
+    def within_radius(self, lat: float, lon: float, radius: float,
+                      with_kiosk: bool = False, with_bikes: bool = False,
+                      with_docks: bool = False,
+                      where: Optional[Callable[['Station'], bool]] = None
+                      ) -> List[int]:
+        """Return the ids of the stations at most radius kilometres from the
+        location given by lat and lon, nearest first, using the same filters
+        and tie-breaking as nearest.
+
+        >>> index = StationIndex(FAKE_STATIONS)
+        >>> index.within_radius(43.0, -79.3, 10)
+        [1000, 1001]
+        >>> index.within_radius(43.0, -79.3, 11.2, with_docks=True)
+        [1000, 1003]
+        """
+
+        search = _Search(lat, lon, _make_filter(with_bikes, with_docks,
+                                                where),
+                         self._kiosk if with_kiosk else None)
+        search.limit = radius
+        found = []
+
+        def accept(distance: float, position: int, station_id: int) -> None:
+            if distance <= radius:
+                found.append((distance, position, station_id))
+
+        search.run(self._root, accept)
+        found.sort()
+
+        return [station_id for _, _, station_id in found]
+
+
+class _Search:
+    """The state of one query against a StationIndex: the query location,
+    the station filter, a 1 for each position allowed if not every position
+    is, and the distance beyond which stations can be skipped.
+    """
+
+    def __init__(self, lat: float, lon: float,
+                 keep: Optional[Callable[['Station'], bool]],
+                 mask: Optional[bytearray] = None) -> None:
+        self.lat = lat
+        self.lon = lon
+        self.point = to_unit_vector(lat, lon)
+        self.keep = keep
+        self.mask = mask
+        self.limit = math.inf
+
+    def run(self, node, accept: Callable[[float, int, int], None]) -> None:
+        """Call accept with the distance, position and id of every station
+        under node that passes the filter and may be within the limit.
+        """
+
+        if isinstance(node, list):
+            self._visit_leaf(node, accept)
+            return
+
+        axis, split, below, above = node
+        offset = self.point[axis] - split
+        near, far = (below, above) if offset <= 0 else (above, below)
+
+        self.run(near, accept)
+        if chord_to_km(abs(offset)) <= self.limit + ROUNDING_SLACK:
+            self.run(far, accept)
+
+    def _visit_leaf(self, leaf: list,
+                    accept: Callable[[float, int, int], None]) -> None:
+        """Call accept for each station in leaf that passes the filter and
+        may be within the limit.
+        """
+
+        qx, qy, qz = self.point
+        for x, y, z, position, station in leaf:
+            if self.mask is not None and not self.mask[position]:
+                continue
+            if self.keep is not None and not self.keep(station):
+                continue
+            chord = math.sqrt((x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2)
+            if chord_to_km(chord) > self.limit + ROUNDING_SLACK:
+                continue
+            distance = get_distance(self.lat, self.lon, station[LATITUDE],
+                                    station[LONGITUDE])
+            accept(distance, position, station[ID])
+
+
+def _build(entries: list):
+    """Return the root of a k-d tree over entries, where each entry is an
+    (x, y, z, position, station) tuple. A leaf is a list of entries and an
+    inner node is an (axis, split, below, above) tuple.
+    """
+
+    if len(entries) <= LEAF_SIZE:
+        return entries
+
+    spreads = [max(entry[axis] for entry in entries) -
+               min(entry[axis] for entry in entries) for axis in range(3)]
+    axis = spreads.index(max(spreads))
+
+    entries.sort(key=lambda entry: entry[axis])
+    middle = len(entries) // 2
+
+    return (axis, entries[middle][axis],
+            _build(entries[:middle]), _build(entries[middle:]))
+
+
+def _make_filter(with_bikes: bool, with_docks: bool,
+                 where: Optional[Callable[['Station'], bool]]
+                 ) -> Optional[Callable[['Station'], bool]]:
+    """Return a function that is True for the stations passing all of the
+    given filters, or None if there are no filters.
+    """
+
+    checks = []
+    if with_bikes:
+        checks.append(lambda station: station[BIKES_AVAILABLE] > 0)
+    if with_docks:
+        checks.append(lambda station: station[DOCKS_AVAILABLE] > 0)
+    if where is not None:
+        checks.append(where)
+
+    if not checks:
+        return None
+
+    return lambda station: all(check(station) for check in checks)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
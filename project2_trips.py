@@ -0,0 +1,112 @@
+"""Directions and distances for many trips at once in project2"""
+#author Muntaqa Mahmood
+
+import copy
+from array import array
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from project2 import SAMPLE_STATIONS, direction_between, get_direction
+from project2_constants import (NORTH, SOUTH, EAST, WEST, NORTH_CODE,
+                                SOUTH_CODE, EAST_CODE, WEST_CODE)
+from project2_distance import distances_between, station_coordinates
+from project2_registry import StationRegistry
+
+# The direction given by each code, built like direction_between builds it.
+DIRECTION_NAMES = [
+    (NORTH if code & NORTH_CODE else SOUTH if code & SOUTH_CODE else '') +
+    (WEST if code & WEST_CODE else EAST if code & EAST_CODE else '')
+    for code in range(16)]
+
+# The code of each direction direction_between can return, the smallest
+# where codes that cannot happen (such as NORTH and SOUTH) share a name.
+DIRECTION_CODES = {DIRECTION_NAMES[code]: code for code in range(15, -1, -1)}
+
+
+def direction_code(starting_station: 'Station',
+                   ending_station: 'Station') -> int:
+    """Return the code of the direction to travel to get from
+    starting_station to ending_station.
+
+    >>> direction_code(SAMPLE_STATIONS[1], SAMPLE_STATIONS[0])
+    10
+    >>> decode_direction(10)
+    'SOUTHWEST'
+    """
+
+    return DIRECTION_CODES[direction_between(starting_station,
+                                             ending_station)]
+
+
+def decode_direction(code: int) -> str:
+    """Return the direction, as returned by get_direction, with code code.
+
+    >>> decode_direction(NORTH_CODE | EAST_CODE)
+    'NORTHEAST'
+    >>> decode_direction(0)
+    ''
+    """
+
+    return DIRECTION_NAMES[code]
+
+
+def decode_directions(codes: Iterable[int]) -> List[str]:
+    """Return the directions with codes codes, in the same order."""
+
+    return [DIRECTION_NAMES[code] for code in codes]
+
+
+def trip_legs(start_ids: Sequence[int], end_ids: Sequence[int],
+              registry: 'StationRegistry') -> Tuple[array, array]:
+    """Return the direction codes and the distances in kilometres of the
+    trips from the station with id start_ids[i] to the station with id
+    end_ids[i] in registry, as an array of small ints and an array of
+    floats. Each code decodes to what get_direction returns for the trip,
+    and each distance is exactly what get_distance returns.
+
+    Each station is looked up once, and each different pair of stations is
+    worked out once however many trips there are between them.
+
+    Precondition: len(start_ids) == len(end_ids), and every id in start_ids
+    and end_ids is in registry.
+
+    >>> registry = StationRegistry(copy.deepcopy(SAMPLE_STATIONS))
+    >>> codes, distances = trip_legs([7486, 7090, 7486], [7090, 7571, 7090],
+    ...                              registry)
+    >>> decode_directions(codes)
+    ['SOUTHWEST', 'SOUTHEAST', 'SOUTHWEST']
+    >>> list(distances)
+    [2.435, 1.197, 2.435]
+    >>> decode_direction(codes[0]) == get_direction(7486, 7090,
+    ...                                             SAMPLE_STATIONS)
+    True
+    """
+
+    # The position of each different (start id, end id) pair.
+    pairs = {}
+    slots = array('L', [pairs.setdefault(pair, len(pairs))
+                        for pair in zip(start_ids, end_ids)])
+
+    # The position of each station in a trip, and the station there.
+    positions: Dict[int, int] = {}
+    stations = []
+    for pair in pairs:
+        for station_id in pair:
+            if station_id not in positions:
+                positions[station_id] = len(stations)
+                stations.append(registry.get_station(station_id))
+
+    pair_codes = array('B', [direction_code(stations[positions[start_id]],
+                                            stations[positions[end_id]])
+                             for start_id, end_id in pairs])
+    lats, lons = station_coordinates(stations)
+    pair_distances = distances_between(
+        lats, lons, [positions[start_id] for start_id, _ in pairs],
+        [positions[end_id] for _, end_id in pairs])
+
+    return (array('B', [pair_codes[slot] for slot in slots]),
+            array('d', [pair_distances[slot] for slot in slots]))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()